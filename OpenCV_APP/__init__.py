@@ -14,9 +14,22 @@ This package provides:
 __version__ = "1.0.0"
 __author__ = "ESP32-CAM Project"
 
-from . import core
-from . import viewers
-from . import utils
-from . import cli
+import importlib
+
+# Subpackages are imported on first access (PEP 562) so that lightweight
+# commands do not pay for importing OpenCV, NumPy, requests and Flask.
+_LAZY_SUBPACKAGES = {'core', 'viewers', 'utils', 'cli'}
 
 __all__ = ['core', 'viewers', 'utils', 'cli']
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBPACKAGES:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _LAZY_SUBPACKAGES)
@@ -8,33 +8,162 @@ camera connectivity and performance.
 import click
 import logging
 import json
-import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, Optional, Tuple
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from OpenCV_APP.core import get_config, CameraDiagnostics, NetworkDiagnostics
+from OpenCV_APP.utils import test_url_reachable, test_stream_endpoint, install_dns_cache
 
-from core import get_config, CameraDiagnostics, NetworkDiagnostics
-from utils import test_url_reachable, test_stream_endpoint
+try:
+    import orjson
+except ImportError:  # optional dependency, fall back to the json module
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Recent diagnostic results, reused by repeated invocations
+CACHE_FILE = Path.home() / ".cache" / "esp32_cam" / "diag.json"
+CACHE_TTL = 30.0  # seconds
+
+_cache_lock = threading.Lock()
+
+
+def _load_cache() -> dict:
+    """Load the diagnostic cache file, returning an empty cache if unavailable."""
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _cache_get(key: str, ttl: float = CACHE_TTL) -> Optional[dict]:
+    """
+    Get cached diagnostic results.
+    
+    Args:
+        key: Cache key
+        ttl: Maximum age of the cached entry in seconds
+        
+    Returns:
+        Cached results, or None if missing or expired
+    """
+    entry = _load_cache().get(key)
+    if isinstance(entry, dict) and time.time() - entry.get('cached_at', 0) < ttl:
+        return entry.get('result')
+    return None
+
+
+def _cache_put(key: str, value: dict):
+    """
+    Store diagnostic results in the cache, dropping expired entries.
+    
+    Args:
+        key: Cache key
+        value: Diagnostic results to store
+    """
+    with _cache_lock:
+        now = time.time()
+        cache = {
+            k: v for k, v in _load_cache().items()
+            if isinstance(v, dict) and now - v.get('cached_at', 0) < CACHE_TTL
+        }
+        cache[key] = {'cached_at': now, 'result': value}
+        
+        try:
+            CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = CACHE_FILE.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, CACHE_FILE)
+        except OSError as e:
+            logger.warning(f"Failed to write diagnostic cache {CACHE_FILE}: {e}")
+
+
+def _run_diagnostics(name: str, cam_config, use_cache: bool = True) -> dict:
+    """
+    Run full diagnostics on a camera, reusing recent results when allowed.
+    
+    Args:
+        name: Camera name
+        cam_config: CameraConfig instance
+        use_cache: Whether cached results may be returned
+        
+    Returns:
+        Dictionary with all diagnostic results
+    """
+    key = f"{name}|{cam_config.ip}|{cam_config.port}"
+    
+    if use_cache:
+        cached = _cache_get(key)
+        if cached is not None:
+            logger.info(f"Using cached diagnostics for {name}")
+            return cached
+    
+    results = CameraDiagnostics.run_full_diagnostics(cam_config.ip, cam_config.port)
+    _cache_put(key, results)
+    return results
+
+
+def _dumps(obj) -> bytes:
+    """Serialize a diagnostic report as indented UTF-8 JSON, using orjson if available."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(obj, indent=2).encode()
+
+
+def _diagnose_cameras(cameras: Dict, use_cache: bool = True) -> Iterator[Tuple[str, dict]]:
+    """
+    Run full diagnostics on all cameras in parallel.
+    
+    Args:
+        cameras: Mapping of camera names to CameraConfig instances
+        use_cache: Whether cached results may be returned
+        
+    Yields:
+        Tuples of (camera_name, diagnostic_results) in completion order
+    """
+    with ThreadPoolExecutor(max_workers=max(1, len(cameras))) as executor:
+        futures = {
+            executor.submit(_run_diagnostics, name, cam, use_cache): name
+            for name, cam in cameras.items()
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
 
 @click.group()
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose output')
 def cli(verbose):
     """ESP32-CAM Diagnostic Tools"""
     level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    root_logger = logging.getLogger()
+    if root_logger.handlers:
+        # Logging is already configured (e.g. by an embedding application);
+        # only adjust verbosity so its handlers are left in place
+        root_logger.setLevel(level)
+    else:
+        logging.basicConfig(
+            level=level,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+    
+    # Commands probe the same camera hosts repeatedly
+    install_dns_cache()
 
 
 @cli.command()
 @click.option('--camera', '-c', default='ESP32_CAM_1', help='Camera name to test')
-def test_camera(camera):
+@click.option('--no-cache', is_flag=True, help='Ignore cached results and re-run all checks')
+def test_camera(camera, no_cache):
     """Test connection to a specific camera."""
     click.echo(f"Testing camera: {camera}")
     
@@ -51,7 +180,7 @@ def test_camera(camera):
     
     # Run diagnostics
     click.echo("Running diagnostics...")
-    results = CameraDiagnostics.run_full_diagnostics(cam_config.ip, cam_config.port)
+    results = _run_diagnostics(camera, cam_config, use_cache=not no_cache)
     
     # Display results
     click.echo(f"\n{'='*50}")
@@ -81,7 +210,8 @@ def test_camera(camera):
 
 
 @cli.command()
-def test_all():
+@click.option('--no-cache', is_flag=True, help='Ignore cached results and re-run all checks')
+def test_all(no_cache):
     """Test all configured cameras."""
     click.echo("Testing all configured cameras...")
     
@@ -92,13 +222,11 @@ def test_all():
         click.echo("❌ No cameras configured", err=True)
         return
     
-    for name, cam_config in cameras.items():
+    for name, results in _diagnose_cameras(cameras, use_cache=not no_cache):
         click.echo(f"\n{'='*50}")
-        click.echo(f"Testing: {name}")
+        click.echo(f"Results: {name}")
         click.echo(f"{'='*50}")
         
-        results = CameraDiagnostics.run_full_diagnostics(cam_config.ip, cam_config.port)
-        
         # Summary
         ping_ok = results['ping_test']
         http_ok = results['http_status']['reachable']
@@ -118,7 +246,8 @@ def test_all():
 
 @cli.command()
 @click.option('--output', '-o', type=click.Path(), help='Output file for results (JSON)')
-def full_report(output: Optional[str]):
+@click.option('--no-cache', is_flag=True, help='Ignore cached results and re-run all checks')
+def full_report(output: Optional[str], no_cache: bool):
     """Generate full diagnostic report for all cameras."""
     click.echo("Generating full diagnostic report...")
     
@@ -126,35 +255,45 @@ def full_report(output: Optional[str]):
     cameras = config.get_all_cameras()
     
     report = {
-        'timestamp': CameraDiagnostics.run_full_diagnostics("127.0.0.1")['timestamp'],
+        'timestamp': datetime.now().isoformat(),
         'cameras': {}
     }
     
-    for name, cam_config in cameras.items():
+    for name in cameras:
         click.echo(f"Testing {name}...")
-        results = CameraDiagnostics.run_full_diagnostics(cam_config.ip, cam_config.port)
-        report['cameras'][name] = results
+    
+    results = dict(_diagnose_cameras(cameras, use_cache=not no_cache))
+    
+    # Keep the report in configuration order regardless of completion order
+    report['cameras'] = {name: results[name] for name in cameras}
     
     # Output results
     if output:
-        with open(output, 'w') as f:
-            json.dump(report, f, indent=2)
+        # Write the encoded bytes as-is, skipping a str round trip
+        with open(output, 'wb', buffering=1 << 16) as f:
+            f.write(_dumps(report))
         click.echo(f"\n✅ Report saved to: {output}")
     else:
         click.echo("\n" + "="*50)
         click.echo("DIAGNOSTIC REPORT")
         click.echo("="*50)
-        click.echo(json.dumps(report, indent=2))
+        click.echo(_dumps(report).decode())
 
 
 @cli.command()
 @click.option('--subnet', '-s', default='192.168.2', help='Subnet to scan (e.g., 192.168.2)')
-def scan_network(subnet):
+@click.option('--concurrency', default=254, show_default=True,
+              help='Maximum number of hosts probed at once')
+def scan_network(subnet, concurrency):
     """Scan network for ESP32-CAM devices."""
     click.echo(f"Scanning subnet {subnet}.0/24 for devices...")
-    click.echo("This may take a few minutes...")
     
-    devices = NetworkDiagnostics.scan_subnet(subnet, port=80, timeout=0.5)
+    try:
+        devices = NetworkDiagnostics.scan_subnet(subnet, port=80, timeout=0.5,
+                                                 concurrency=concurrency)
+    except ValueError as e:
+        click.echo(f"❌ Invalid subnet {subnet}: {e}", err=True)
+        return
     
     if devices:
         click.echo(f"\n✅ Found {len(devices)} device(s):")
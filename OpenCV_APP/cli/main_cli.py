@@ -7,14 +7,8 @@ various camera viewing and diagnostic operations.
 
 import click
 import logging
-import sys
-from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from viewers import DualCameraViewer, SingleCameraViewer
-from core import get_config
+from OpenCV_APP.core import get_config
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +25,16 @@ def cli(ctx, verbose, config):
     """
     # Setup logging
     level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    root_logger = logging.getLogger()
+    if root_logger.handlers:
+        # Logging is already configured (e.g. by an embedding application);
+        # only adjust verbosity so its handlers are left in place
+        root_logger.setLevel(level)
+    else:
+        logging.basicConfig(
+            level=level,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
     
     # Store config in context
     ctx.ensure_object(dict)
@@ -50,6 +50,7 @@ def view(ctx):
     click.echo("Press 'q' to quit, 's' to save frame pair, 'a' to save annotated frames")
     
     try:
+        from OpenCV_APP.viewers import DualCameraViewer
         viewer = DualCameraViewer(config_file=ctx.obj.get('config_file'))
         viewer.run()
     except Exception as e:
@@ -68,6 +69,7 @@ def view_single(ctx, camera):
     click.echo("Press 'q' to quit, 's' to save frame, 'a' to save annotated frame")
     
     try:
+        from OpenCV_APP.viewers import SingleCameraViewer
         viewer = SingleCameraViewer(camera, config_file=ctx.obj.get('config_file'))
         viewer.run()
     except Exception as e:
@@ -80,33 +82,39 @@ def view_single(ctx, camera):
 @click.option('--host', '-h', default='0.0.0.0', help='Host to bind to (default: 0.0.0.0)')
 @click.option('--port', '-p', default=5000, help='Port to listen on (default: 5000)')
 @click.option('--debug', is_flag=True, help='Enable debug mode')
-def web(host, port, debug):
+@click.option('--transcode', is_flag=True,
+              help='Decode and re-encode frames instead of forwarding camera JPEGs')
+@click.option('--workers', '-w', default=1,
+              help='Server worker processes when gunicorn is installed (default: 1)')
+def web(host, port, debug, transcode, workers):
     """Launch web-based viewer."""
     click.echo(f"🌐 Launching Web Viewer...")
     click.echo(f"Access at: http://{host}:{port}")
     
     try:
-        from viewers.web_viewer import main as web_main
-        web_main(host=host, port=port, debug=debug)
+        from OpenCV_APP.viewers.web_viewer import main as web_main
+        web_main(host=host, port=port, debug=debug, passthrough=not transcode,
+                 workers=workers)
     except Exception as e:
         click.echo(f"❌ Error: {e}", err=True)
         raise
 
 
 @cli.command()
+@click.option('--no-cache', is_flag=True, help='Ignore cached results and re-run all checks')
 @click.pass_context
-def diagnose(ctx):
+def diagnose(ctx, no_cache):
     """Run diagnostic tests on cameras."""
     click.echo("🔍 Running camera diagnostics...")
     
-    from diagnostic_cli import cli as diag_cli
-    
-    # Pass control to diagnostic CLI
-    sys.argv = ['diagnostic_cli', 'test-all']
-    if ctx.obj.get('verbose'):
-        sys.argv.append('--verbose')
+    from OpenCV_APP.cli.diagnostic_cli import test_all
+    from OpenCV_APP.utils import install_dns_cache
     
-    diag_cli()
+    install_dns_cache()
+    # Load the selected configuration, then run the command in-process;
+    # logging was already set up by this CLI
+    get_config(ctx.obj.get('config_file'))
+    ctx.invoke(test_all, no_cache=no_cache)
 
 
 @cli.command()
@@ -141,7 +149,6 @@ def add_camera(name, ip, port):
     click.echo(f"Adding camera: {name} ({ip}:{port})")
     
     try:
-        from core import get_config
         config = get_config()
         config.add_camera(name, ip, port)
         
@@ -5,10 +5,22 @@ This package contains the fundamental components for camera management,
 configuration, connection handling, and diagnostics.
 """
 
-from .config import AppConfig, CameraConfig, get_config, reset_config
-from .camera_base import CameraBase, ESP32Camera, MockCamera
-from .connection_manager import ConnectionManager
-from .diagnostics import CameraDiagnostics, NetworkDiagnostics
+import importlib
+
+# Names are imported from their submodule on first access (PEP 562), so
+# commands that only need configuration or diagnostics do not import OpenCV.
+_LAZY_ATTRIBUTES = {
+    'AppConfig': 'config',
+    'CameraConfig': 'config',
+    'get_config': 'config',
+    'reset_config': 'config',
+    'CameraBase': 'camera_base',
+    'ESP32Camera': 'camera_base',
+    'MockCamera': 'camera_base',
+    'ConnectionManager': 'connection_manager',
+    'CameraDiagnostics': 'diagnostics',
+    'NetworkDiagnostics': 'diagnostics',
+}
 
 __all__ = [
     'AppConfig',
@@ -22,3 +34,16 @@ __all__ = [
     'CameraDiagnostics',
     'NetworkDiagnostics',
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
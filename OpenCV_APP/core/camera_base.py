@@ -7,13 +7,19 @@ for camera connection and frame capture.
 
 import cv2
 import numpy as np
-import requests
+import os
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Demuxer options for OpenCV's FFmpeg backend, which ignores
+# CAP_PROP_BUFFERSIZE; without them FFmpeg buffers frames while probing the
+# stream. An OPENCV_FFMPEG_CAPTURE_OPTIONS set by the user takes precedence.
+FFMPEG_CAPTURE_OPTIONS = "fflags;nobuffer|flags;low_delay"
+
 
 class CameraBase(ABC):
     """Abstract base class for camera interfaces."""
@@ -29,6 +35,9 @@ class CameraBase(ABC):
         self.name = name
         self.stream_url = stream_url
         self._is_connected = False
+        # time.monotonic() of the last successful read, set by read()
+        self.last_read_ts: Optional[float] = None
+        self._grabbed: Optional[np.ndarray] = None
     
     @abstractmethod
     def connect(self) -> bool:
@@ -50,6 +59,29 @@ class CameraBase(ABC):
         """
         pass
     
+    def grab(self) -> bool:
+        """
+        Advance to the next frame without necessarily decoding it.
+        
+        Call retrieve() to get the grabbed frame. Skipping retrieve() for
+        frames that are not needed saves their decode where the camera
+        supports it; the default implementation simply reads the frame.
+        
+        Returns:
+            True if a frame was grabbed
+        """
+        ret, self._grabbed = self.read()
+        return ret
+    
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Get the frame taken by the last successful grab().
+        
+        Returns:
+            Tuple of (success, frame)
+        """
+        return self._grabbed is not None, self._grabbed
+    
     @abstractmethod
     def disconnect(self):
         """Disconnect from the camera."""
@@ -77,49 +109,57 @@ class ESP32Camera(CameraBase):
         self.timeout = timeout
         self._capture: Optional[cv2.VideoCapture] = None
         self._last_frame: Optional[np.ndarray] = None
+        # Decoded into again by every retrieve() once the frame size is known
+        self._retrieve_buffer: Optional[np.ndarray] = None
         self._frame_count = 0
     
-    def connect(self) -> bool:
+    def connect(self, verify: bool = False) -> bool:
         """
         Connect to the ESP32-CAM stream.
         
+        Args:
+            verify: Read one frame to confirm the stream delivers images.
+                When False, the first call to read() reports any failure.
+        
         Returns:
             True if connection successful, False otherwise
         """
         try:
             logger.info(f"Connecting to {self.name} at {self.stream_url}")
             
-            # Test if URL is accessible
-            response = requests.get(self.stream_url, timeout=self.timeout, stream=True)
-            response.close()
-            
-            if response.status_code != 200:
-                logger.error(f"Failed to connect to {self.name}: HTTP {response.status_code}")
-                return False
-            
-            # Create VideoCapture
-            self._capture = cv2.VideoCapture(self.stream_url)
+            # Open the stream directly; the device only has a few sockets, so
+            # there is no separate reachability probe. The open timeout makes
+            # an unreachable camera fail within self.timeout.
+            timeout_ms = int(self.timeout * 1000)
+            os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", FFMPEG_CAPTURE_OPTIONS)
+            self._capture = cv2.VideoCapture(self.stream_url, cv2.CAP_ANY, [
+                cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+                cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms,
+            ])
             
             if not self._capture.isOpened():
                 logger.error(f"Failed to open video capture for {self.name}")
                 return False
             
-            # Try to read one frame to verify
-            ret, frame = self._capture.read()
-            if ret and frame is not None:
-                self._is_connected = True
-                self._last_frame = frame
-                logger.info(f"Successfully connected to {self.name}")
-                return True
-            else:
-                logger.error(f"Failed to read initial frame from {self.name}")
-                self._capture.release()
-                self._capture = None
-                return False
+            # Keep only the newest frame buffered to minimise latency
+            if not self._capture.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                logger.debug(f"{self._capture.getBackendName()} backend ignores the "
+                             f"buffer size for {self.name}")
+                
+            if verify:
+                ret, frame = self._capture.read()
+                if ret and frame is not None:
+                    self._last_frame = frame
+                else:
+                    logger.error(f"Failed to read initial frame from {self.name}")
+                    self._capture.release()
+                    self._capture = None
+                    return False
+            
+            self._is_connected = True
+            logger.info(f"Successfully connected to {self.name}")
+            return True
                 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Connection error for {self.name}: {e}")
-            return False
         except Exception as e:
             logger.error(f"Unexpected error connecting to {self.name}: {e}")
             return False
@@ -139,6 +179,7 @@ class ESP32Camera(CameraBase):
             if ret and frame is not None:
                 self._last_frame = frame
                 self._frame_count += 1
+                self.last_read_ts = time.monotonic()
                 return True, frame
             else:
                 logger.warning(f"Failed to read frame from {self.name}")
@@ -147,6 +188,49 @@ class ESP32Camera(CameraBase):
             logger.error(f"Error reading frame from {self.name}: {e}")
             return False, None
     
+    def grab(self) -> bool:
+        """
+        Receive the next frame from the stream without decoding it.
+        
+        Returns:
+            True if a frame was grabbed
+        """
+        if not self._is_connected or self._capture is None:
+            return False
+        
+        try:
+            if self._capture.grab():
+                self.last_read_ts = time.monotonic()
+                return True
+            logger.warning(f"Failed to grab frame from {self.name}")
+        except Exception as e:
+            logger.error(f"Error grabbing frame from {self.name}: {e}")
+        return False
+    
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Decode the frame taken by the last successful grab().
+        
+        The returned array is reused by the next call to retrieve(); copy it
+        if it must outlive that call. It is not kept as the last good frame
+        that read() falls back to.
+        
+        Returns:
+            Tuple of (success, frame)
+        """
+        if not self._is_connected or self._capture is None:
+            return False, None
+        
+        try:
+            ret, frame = self._capture.retrieve(self._retrieve_buffer)
+            if ret and frame is not None:
+                self._retrieve_buffer = frame
+                self._frame_count += 1
+                return True, frame
+        except Exception as e:
+            logger.error(f"Error decoding frame from {self.name}: {e}")
+        return False, None
+    
     def disconnect(self):
         """Disconnect from the camera."""
         if self._capture is not None:
@@ -167,6 +251,13 @@ class ESP32Camera(CameraBase):
 class MockCamera(CameraBase):
     """Mock camera for testing purposes."""
     
+    # Text overlay settings; LABEL_ROWS covers the text drawn at LABEL_ORIGIN
+    LABEL_ORIGIN = (10, 30)
+    LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+    LABEL_SCALE = 0.7
+    LABEL_THICKNESS = 2
+    LABEL_ROWS = 45
+    
     def __init__(self, name: str, width: int = 640, height: int = 480):
         """
         Initialize mock camera.
@@ -181,6 +272,43 @@ class MockCamera(CameraBase):
         self.height = height
         self._frame_count = 0
     
+        # Frame buffer reused by every read(); the green channel is constant
+        self._frame = np.empty((height, width, 3), dtype=np.uint8)
+        self._frame[:, :, 1] = 128
+        
+        # When a row holds a whole number of 4-pixel groups (12 bytes = three
+        # uint32 words), the frame is filled through a uint32 view of the
+        # buffer instead of two strided single-channel writes
+        self._words = None
+        if width % 4 == 0:
+            self._words = self._frame.reshape(height, width * 3).view(np.uint32)
+        
+        # The label prefix is drawn on a uniform background that only depends
+        # on the color value, so rendered prefix strips are cached per color
+        # and only the frame number is drawn per frame
+        self._label_prefix = f"{name} - Frame "
+        prefix_width = (
+            cv2.getTextSize(self._label_prefix + "0", self.LABEL_FONT,
+                            self.LABEL_SCALE, self.LABEL_THICKNESS)[0][0]
+            - cv2.getTextSize("0", self.LABEL_FONT,
+                              self.LABEL_SCALE, self.LABEL_THICKNESS)[0][0]
+        )
+        self._counter_origin = (self.LABEL_ORIGIN[0] + prefix_width, self.LABEL_ORIGIN[1])
+        self._label_strips: Dict[int, np.ndarray] = {}
+    
+    def _label_strip(self, color_value: int) -> np.ndarray:
+        """Get the label prefix rendered over the background for a color value."""
+        strip = self._label_strips.get(color_value)
+        if strip is None:
+            rows = min(self.LABEL_ROWS, self.height)
+            cols = min(self._counter_origin[0], self.width)
+            strip = np.empty((rows, cols, 3), dtype=np.uint8)
+            strip[:, :] = [color_value, 128, 255 - color_value]
+            cv2.putText(strip, self._label_prefix, self.LABEL_ORIGIN, self.LABEL_FONT,
+                        self.LABEL_SCALE, (255, 255, 255), self.LABEL_THICKNESS)
+            self._label_strips[color_value] = strip
+        return strip
+    
     def connect(self) -> bool:
         """Connect to mock camera (always succeeds)."""
         self._is_connected = True
@@ -191,6 +319,9 @@ class MockCamera(CameraBase):
         """
         Generate a mock frame.
         
+        The returned array is reused by the next call to read(); copy it
+        if it must outlive that call.
+        
         Returns:
             Tuple of (success, frame)
         """
@@ -198,15 +329,29 @@ class MockCamera(CameraBase):
             return False, None
         
         # Generate a frame with changing color based on frame count
-        frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        frame = self._frame
         color_value = (self._frame_count % 255)
-        frame[:, :] = [color_value, 128, 255 - color_value]
+        if self._words is not None:
+            # Pack four BGR pixels into three words and repeat that row-wide;
+            # this also clears the previous text overlay
+            pixels = np.array([color_value, 128, 255 - color_value] * 4, dtype=np.uint8)
+            self._words[:] = np.tile(pixels.view(np.uint32), self.width // 4)
+        else:
+            # Only the blue and red planes change between frames
+            frame[:, :, 0] = color_value
+            frame[:, :, 2] = 255 - color_value
+        
+            # Clear the previous text overlay from the constant green plane
+            frame[:self.LABEL_ROWS, :, 1] = 128
         
-        # Add text overlay
-        cv2.putText(frame, f"{self.name} - Frame {self._frame_count}", 
-                   (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        # Add text overlay: copy in the prerendered prefix, then draw the number
+        strip = self._label_strip(color_value)
+        frame[:strip.shape[0], :strip.shape[1]] = strip
+        cv2.putText(frame, str(self._frame_count), self._counter_origin,
+                   self.LABEL_FONT, self.LABEL_SCALE, (255, 255, 255), self.LABEL_THICKNESS)
         
         self._frame_count += 1
+        self.last_read_ts = time.monotonic()
         return True, frame
     
     def disconnect(self):
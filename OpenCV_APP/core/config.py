@@ -7,21 +7,70 @@ This module handles configuration from multiple sources:
 - Default values
 """
 
+import functools
 import os
+import threading
 import yaml
 from typing import Dict, Optional
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+# Configuration file shipped with the application
+_DEFAULT_CONFIG_PATH = str(Path(__file__).parent.parent / "config" / "camera_config.yaml")
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    """Get a file's modification time, or None if it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _read_yaml(config_file: str, mtime_ns: int) -> Optional[dict]:
+    """
+    Parse a YAML file.
+    
+    Results are cached per (path, modification time), so an unchanged file
+    is only parsed once per process. Callers must not mutate the result.
+    
+    Args:
+        config_file: Path to the YAML file
+        mtime_ns: Modification time of the file, used as part of the cache key
+        
+    Returns:
+        Parsed YAML data
+    """
+    with open(config_file, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
 
 class CameraConfig:
     """Configuration for a single camera."""
     
-    def __init__(self, name: str, ip: str, port: int = 80):
+    def __init__(self, name: str, ip: str, port: int = 80,
+                 target_fps: Optional[float] = None):
         self.name = name
         self.ip = ip
         self.port = port
-        self.stream_url = f"http://{ip}:{port}/stream"
-        self.status_url = f"http://{ip}:{port}/"
+        # Frames per second decoded for consumers that need fewer than the
+        # camera sends, such as the web viewer; None means the viewer default
+        self.target_fps = target_fps
+    
+    @functools.cached_property
+    def stream_url(self) -> str:
+        """MJPEG stream URL, built on first access."""
+        return f"http://{self.ip}:{self.port}/stream"
+    
+    @functools.cached_property
+    def status_url(self) -> str:
+        """Status page URL, built on first access."""
+        return f"http://{self.ip}:{self.port}/"
     
     def __repr__(self):
         return f"CameraConfig(name='{self.name}', ip='{self.ip}', port={self.port})"
@@ -46,14 +95,14 @@ class AppConfig:
     
     def _load_config(self, config_file: Optional[str] = None):
         """Load configuration from file and environment variables."""
-        # First, try to load from YAML file
-        if config_file and Path(config_file).exists():
-            self._load_from_yaml(config_file)
-        else:
-            # Try default config location
-            default_config = Path(__file__).parent.parent / "config" / "camera_config.yaml"
-            if default_config.exists():
-                self._load_from_yaml(str(default_config))
+        # First, try to load from YAML file, then the default config location.
+        # A single stat both checks the file exists and keys the parse cache.
+        mtime_ns = _mtime_ns(config_file) if config_file else None
+        if mtime_ns is None:
+            config_file = _DEFAULT_CONFIG_PATH
+            mtime_ns = _mtime_ns(config_file)
+        if mtime_ns is not None:
+            self._load_from_yaml(config_file, mtime_ns)
         
         # Override with environment variables (higher priority)
         self._load_from_env()
@@ -67,20 +116,20 @@ class AppConfig:
             cam2_ip = os.getenv("ESP32_CAM_2_IP", self.DEFAULT_CAM_2_IP)
             self.cameras["ESP32_CAM_2"] = CameraConfig("ESP32_CAM_2", cam2_ip)
     
-    def _load_from_yaml(self, config_file: str):
-        """Load configuration from YAML file."""
+    def _load_from_yaml(self, config_file: str, mtime_ns: int):
+        """Load configuration from YAML file with the given modification time."""
         try:
-            with open(config_file, 'r') as f:
-                config_data = yaml.safe_load(f)
+            config_data = _read_yaml(config_file, mtime_ns)
                 
             if config_data and 'cameras' in config_data:
                 for cam_data in config_data['cameras']:
                     name = cam_data.get('name')
                     ip = cam_data.get('ip')
                     port = cam_data.get('port', 80)
+                    target_fps = cam_data.get('target_fps')
                     
                     if name and ip:
-                        self.cameras[name] = CameraConfig(name, ip, port)
+                        self.cameras[name] = CameraConfig(name, ip, port, target_fps)
         except Exception as e:
             print(f"Warning: Failed to load config from {config_file}: {e}")
     
@@ -113,6 +162,7 @@ class AppConfig:
 
 # Global configuration instance
 _config_instance: Optional[AppConfig] = None
+_config_lock = threading.Lock()
 
 
 def get_config(config_file: Optional[str] = None) -> AppConfig:
@@ -127,11 +177,16 @@ def get_config(config_file: Optional[str] = None) -> AppConfig:
     """
     global _config_instance
     if _config_instance is None:
-        _config_instance = AppConfig(config_file)
+        # Checked again under the lock so concurrent first calls build one instance
+        with _config_lock:
+            if _config_instance is None:
+                _config_instance = AppConfig(config_file)
     return _config_instance
 
 
 def reset_config():
     """Reset the global configuration instance."""
     global _config_instance
-    _config_instance = None
+    with _config_lock:
+        _config_instance = None
+    _read_yaml.cache_clear()
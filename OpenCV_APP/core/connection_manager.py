@@ -5,30 +5,64 @@ This module provides robust connection handling with retry logic,
 error recovery, and connection pooling.
 """
 
+import random
+import socket
 import time
 import logging
-from typing import Dict, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, List, Tuple, TypeVar
+from urllib.parse import urlparse
 from .camera_base import CameraBase, ESP32Camera
 from .config import CameraConfig
+from .diagnostics import CameraDiagnostics
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# Errors that retrying cannot fix, such as an unresolvable host name
+UNRECOVERABLE_ERRORS = (socket.gaierror, ValueError)
+
+# Readiness polling before a reconnect: up to 10 probes, 0.1s apart
+READY_POLL_ATTEMPTS = 10
+READY_POLL_INTERVAL = 0.1
+
 
 class ConnectionManager:
     """Manages connections to multiple cameras with retry logic."""
     
-    def __init__(self, retry_attempts: int = 3, retry_delay: int = 2):
+    def __init__(self, retry_attempts: int = 3, retry_delay: float = 2,
+                 retry_max_delay: float = 30, retry_jitter: float = 0.1,
+                 health_ttl: float = 1.0, failure_threshold: int = 3,
+                 failure_cooldown: float = 30):
         """
         Initialize connection manager.
         
         Args:
             retry_attempts: Number of connection retry attempts
-            retry_delay: Delay between retries in seconds
+            retry_delay: Delay before the first retry in seconds; it doubles
+                after each further failed attempt
+            retry_max_delay: Upper bound on the delay between retries in seconds
+            retry_jitter: Maximum random fraction added to each delay so that
+                cameras failing together do not retry in lockstep
+            health_ttl: Seconds for which health_check results are reused
+            failure_threshold: Consecutive failed connect_camera() calls, each
+                after all of its retry attempts, after which a camera is not
+                retried until the cooldown has passed (0 disables this)
+            failure_cooldown: Seconds after the last failure before a camera
+                that reached the failure threshold is tried again
         """
         self.retry_attempts = retry_attempts
         self.retry_delay = retry_delay
+        self.retry_max_delay = retry_max_delay
+        self.retry_jitter = retry_jitter
+        self.health_ttl = health_ttl
+        self.failure_threshold = failure_threshold
+        self.failure_cooldown = failure_cooldown
         self.cameras: Dict[str, CameraBase] = {}
         self._connection_stats: Dict[str, dict] = {}
+        # (monotonic timestamp, results) of the last full health check
+        self._health_cache: Optional[Tuple[float, Dict[str, bool]]] = None
     
     def add_camera(self, camera: CameraBase):
         """
@@ -42,6 +76,8 @@ class ConnectionManager:
             'attempts': 0,
             'successes': 0,
             'failures': 0,
+            'consecutive_failures': 0,
+            'last_failure_ts': None,
             'last_error': None
         }
         logger.info(f"Added camera {camera.name} to connection manager")
@@ -56,10 +92,74 @@ class ConnectionManager:
         camera = ESP32Camera(config.name, config.stream_url)
         self.add_camera(camera)
     
+    def _for_each_camera(self, func: Callable[[str], T],
+                         names: Optional[Iterable[str]] = None) -> Dict[str, T]:
+        """
+        Call a function for every camera concurrently.
+        
+        Camera operations block on network I/O, so running them in parallel
+        makes the total time that of the slowest camera rather than the sum.
+        
+        Args:
+            func: Function taking a camera name
+            names: Camera names to call it for (defaults to all cameras)
+            
+        Returns:
+            Dictionary mapping camera names to the function's results
+        """
+        names = list(self.cameras if names is None else names)
+        if not names:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            futures = {name: executor.submit(func, name) for name in names}
+            return {name: future.result() for name, future in futures.items()}
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Get the delay before retrying after a failed attempt.
+        
+        Args:
+            attempt: Number of the attempt that failed, starting at 1
+            
+        Returns:
+            Delay in seconds
+        """
+        delay = min(self.retry_max_delay, self.retry_delay * 2 ** (attempt - 1))
+        return delay * (1 + random.uniform(0, self.retry_jitter))
+    
+    def _circuit_open(self, name: str) -> bool:
+        """
+        Check whether recent failures mean a camera should not be retried yet.
+        
+        Args:
+            name: Camera name
+            
+        Returns:
+            True if the camera reached the failure threshold within the cooldown
+        """
+        stats = self._connection_stats[name]
+        return (
+            self.failure_threshold > 0
+            and stats['consecutive_failures'] >= self.failure_threshold
+            and time.monotonic() - stats['last_failure_ts'] < self.failure_cooldown
+        )
+    
+    @staticmethod
+    def _record_failure(stats: dict):
+        """Count a connect_camera() call whose attempts all failed."""
+        stats['consecutive_failures'] += 1
+        stats['last_failure_ts'] = time.monotonic()
+    
     def connect_camera(self, name: str) -> bool:
         """
         Connect to a specific camera with retry logic.
         
+        Retries use exponential backoff with jitter. Errors that a retry
+        cannot fix, such as a host name that does not resolve, end the
+        attempts early. A camera for which failure_threshold calls in a row
+        failed is not tried again until failure_cooldown seconds have passed.
+        
         Args:
             name: Camera name
             
@@ -73,13 +173,32 @@ class ConnectionManager:
         camera = self.cameras[name]
         stats = self._connection_stats[name]
         
+        if self._circuit_open(name):
+            logger.warning(f"Skipping connection to {name}: "
+                           f"{stats['consecutive_failures']} consecutive failures")
+            return False
+        
+        # camera.connect() reports every error as False, so problems no
+        # retry can fix are looked for before the first attempt
+        try:
+            self._resolve_host(camera)
+        except UNRECOVERABLE_ERRORS as e:
+            stats['attempts'] += 1
+            stats['failures'] += 1
+            stats['last_error'] = str(e)
+            self._record_failure(stats)
+            logger.error(f"Unrecoverable error connecting to {name}: {e}")
+            return False
+        
         for attempt in range(1, self.retry_attempts + 1):
             stats['attempts'] += 1
             logger.info(f"Connecting to {name} (attempt {attempt}/{self.retry_attempts})")
             
             try:
                 if camera.connect():
+                    self._health_cache = None
                     stats['successes'] += 1
+                    stats['consecutive_failures'] = 0
                     logger.info(f"Successfully connected to {name}")
                     return True
                 else:
@@ -91,23 +210,22 @@ class ConnectionManager:
                 logger.error(f"Error connecting to {name}: {e}")
             
             if attempt < self.retry_attempts:
-                logger.info(f"Retrying in {self.retry_delay} seconds...")
-                time.sleep(self.retry_delay)
+                delay = self._backoff_delay(attempt)
+                logger.info(f"Retrying in {delay:.2f} seconds...")
+                time.sleep(delay)
         
+        self._record_failure(stats)
         logger.error(f"Failed to connect to {name} after {self.retry_attempts} attempts")
         return False
     
     def connect_all(self) -> Dict[str, bool]:
         """
-        Connect to all cameras.
+        Connect to all cameras in parallel.
         
         Returns:
             Dictionary mapping camera names to connection success status
         """
-        results = {}
-        for name in self.cameras.keys():
-            results[name] = self.connect_camera(name)
-        return results
+        return self._for_each_camera(self.connect_camera)
     
     def disconnect_camera(self, name: str):
         """
@@ -118,12 +236,12 @@ class ConnectionManager:
         """
         if name in self.cameras:
             self.cameras[name].disconnect()
+            self._health_cache = None
             logger.info(f"Disconnected camera {name}")
     
     def disconnect_all(self):
-        """Disconnect all cameras."""
-        for name in self.cameras.keys():
-            self.disconnect_camera(name)
+        """Disconnect all cameras in parallel."""
+        self._for_each_camera(self.disconnect_camera)
     
     def get_camera(self, name: str) -> Optional[CameraBase]:
         """
@@ -171,30 +289,152 @@ class ConnectionManager:
         if name not in self.cameras:
             return False
         
+        # Keep the current connection if the camera is known to be down
+        if self._circuit_open(name):
+            logger.warning(f"Not reconnecting {name}: too many recent failures")
+            return False
+        
         logger.info(f"Reconnecting camera {name}")
         self.disconnect_camera(name)
-        time.sleep(1)  # Brief pause before reconnecting
+        self._wait_until_reachable(self.cameras[name])
         return self.connect_camera(name)
     
-    def health_check(self) -> Dict[str, bool]:
+    @staticmethod
+    def _stream_address(camera: CameraBase) -> Optional[Tuple[str, int]]:
         """
-        Check health of all cameras by attempting to read a frame.
+        Get the host and port a network camera streams from.
+        
+        Args:
+            camera: Camera instance
+            
+        Returns:
+            (host, port), or None for cameras without a network host
+            
+        Raises:
+            ValueError: If the stream URL has an invalid port
+        """
+        parsed = urlparse(camera.stream_url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            return None
+        return parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80)
+    
+    @classmethod
+    def _resolve_host(cls, camera: CameraBase):
+        """
+        Check that a network camera's stream host name resolves.
+        
+        Temporary resolver failures are ignored so that the connection
+        attempts can still be retried.
+        
+        Args:
+            camera: Camera about to be connected
+            
+        Raises:
+            socket.gaierror: If the host name does not resolve
+            ValueError: If the stream URL has an invalid port
+        """
+        address = cls._stream_address(camera)
+        if address is None:
+            return
+        
+        try:
+            socket.getaddrinfo(*address, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if e.errno != socket.EAI_AGAIN:
+                raise
+    
+    @classmethod
+    def _wait_until_reachable(cls, camera: CameraBase):
+        """
+        Wait briefly for a network camera to accept connections.
+        
+        Returns as soon as the camera's stream host answers, or after
+        READY_POLL_ATTEMPTS probes. Cameras without a network host return
+        immediately.
+        
+        Args:
+            camera: Camera about to be connected
+        """
+        try:
+            address = cls._stream_address(camera)
+        except ValueError:
+            return  # connect_camera reports the invalid URL
+        if address is None:
+            return
+        
+        for _ in range(READY_POLL_ATTEMPTS):
+            if CameraDiagnostics.ping_camera(*address, READY_POLL_INTERVAL):
+                return
+            time.sleep(READY_POLL_INTERVAL)
+    
+    def health_check(self, use_cache: bool = True,
+                     names: Optional[Iterable[str]] = None,
+                     freshness: float = 0.5) -> Dict[str, bool]:
+        """
+        Check health of cameras by attempting to read a frame.
+        
+        Cameras are checked in parallel. A connected camera that delivered a
+        frame within the last ``freshness`` seconds counts as healthy without
+        another read. Results for all cameras are reused for health_ttl
+        seconds, or until a camera connects or disconnects.
+        
+        Args:
+            use_cache: Reuse recent results instead of reading new frames
+            names: Only check these cameras; always checked afresh
+            freshness: Age in seconds below which a camera's last read counts
         
         Returns:
             Dictionary mapping camera names to health status
         """
+        if names is not None:
+            return self._check_cameras(names, freshness)
+        
+        cached = self._health_cache
+        if use_cache and cached is not None and time.monotonic() - cached[0] < self.health_ttl:
+            return dict(cached[1])
+        
+        health_status = self._check_cameras(self.cameras, freshness)
+        self._health_cache = (time.monotonic(), health_status)
+        return dict(health_status)
+    
+    def _check_cameras(self, names: Iterable[str], freshness: float) -> Dict[str, bool]:
+        """
+        Check cameras' health, reading frames only where needed.
+        
+        Disconnected cameras are unhealthy and recently read ones healthy
+        without further work; only the remaining cameras are read, in parallel.
+        
+        Args:
+            names: Camera names to check
+            freshness: Age in seconds below which a camera's last read counts
+            
+        Returns:
+            Dictionary mapping camera names to health status
+        """
+        now = time.monotonic()
         health_status = {}
-        for name, camera in self.cameras.items():
+        to_read = []
+        for name in names:
+            camera = self.cameras[name]
             if not camera.is_connected:
                 health_status[name] = False
-                continue
+            elif camera.last_read_ts is not None and now - camera.last_read_ts < freshness:
+                health_status[name] = True
+            else:
+                health_status[name] = False
+                to_read.append(name)
             
-            # Try to read a frame
-            ret, frame = camera.read()
-            health_status[name] = ret and frame is not None
-        
+        health_status.update(self._for_each_camera(self._read_ok, to_read))
         return health_status
+        
+    def _read_ok(self, name: str) -> bool:
+        """Check one camera's health by attempting to read a frame."""
+        ret, frame = self.cameras[name].read()
+        return ret and frame is not None
     
     def __del__(self):
         """Cleanup on destruction."""
-        self.disconnect_all()
+        # Disconnect serially; no new threads can be started during
+        # interpreter shutdown
+        for name in list(self.cameras):
+            self.disconnect_camera(name)
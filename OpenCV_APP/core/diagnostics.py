@@ -5,19 +5,57 @@ This module provides tools for testing camera connectivity,
 network diagnostics, and performance monitoring.
 """
 
+import asyncio
+import functools
+import ipaddress
 import requests
 import time
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from datetime import datetime
 import socket
+from concurrent.futures import ThreadPoolExecutor
+
+from .http import SESSION, close_session
+from .sockets import open_connections
 
 logger = logging.getLogger(__name__)
 
+# Ping results are reused for this many seconds within one process
+PING_CACHE_TTL = 5
+
+# OpenCV is only needed for stream quality tests; see _cv2_mod
+_cv2 = None
+
+
+def _cv2_mod():
+    """Import OpenCV on first use, so other diagnostics do not load it."""
+    global _cv2
+    if _cv2 is None:
+        import cv2
+        _cv2 = cv2
+    return _cv2
+
+
+@functools.lru_cache(maxsize=32)
+def _ping_once(ip: str, port: int, bucket: int) -> bool:
+    """Ping a camera once per time bucket; ``bucket`` only keys the cache."""
+    return CameraDiagnostics.ping_camera(ip, port)
+
 
 class CameraDiagnostics:
     """Diagnostic tools for ESP32-CAM cameras."""
     
+    @classmethod
+    def close(cls):
+        """
+        Close pooled HTTP connections to cameras.
+        
+        HTTP checks share one keep-alive session; it stays usable after
+        closing and reconnects on the next request.
+        """
+        close_session()
+    
     @staticmethod
     def ping_camera(ip: str, port: int = 80, timeout: int = 3) -> bool:
         """
@@ -31,15 +69,50 @@ class CameraDiagnostics:
         Returns:
             True if camera is reachable, False otherwise
         """
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            result = sock.connect_ex((ip, port))
+        return CameraDiagnostics.ping_many([ip], port, timeout)[ip]
+    
+    @staticmethod
+    def ping_many(ips: Iterable[str], port: int = 80,
+                  timeout: float = 3) -> Dict[str, bool]:
+        """
+        Check if several hosts are reachable via TCP, all at once.
+        
+        Non-blocking connects are started for every host and then waited on
+        together with a selector, so checking many hosts takes about one
+        timeout on a single thread.
+        
+        Args:
+            ips: Host IP addresses
+            port: Port to check
+            timeout: Timeout in seconds for all hosts together
+            
+        Returns:
+            Dictionary mapping each IP address to whether it accepted the connection
+        """
+        hosts = list(ips)
+        results = dict.fromkeys(hosts, False)
+        for index, sock in open_connections(hosts, port, timeout):
+            results[hosts[index]] = True
             sock.close()
-            return result == 0
-        except Exception as e:
-            logger.error(f"Error ping {ip}:{port} - {e}")
-            return False
+        
+        return results
+    
+    @staticmethod
+    def cached_ping(ip: str, port: int = 80) -> bool:
+        """
+        Check if camera is reachable, reusing a result from the last few seconds.
+        
+        Commands that diagnose the same camera more than once in a run only
+        probe it once per PING_CACHE_TTL window.
+        
+        Args:
+            ip: Camera IP address
+            port: Camera port
+            
+        Returns:
+            True if camera is reachable, False otherwise
+        """
+        return _ping_once(ip, port, int(time.time()) // PING_CACHE_TTL)
     
     @staticmethod
     def check_http_status(url: str, timeout: int = 5) -> Dict[str, any]:
@@ -64,7 +137,7 @@ class CameraDiagnostics:
         
         try:
             start_time = time.time()
-            response = requests.get(url, timeout=timeout)
+            response = SESSION.get(url, timeout=timeout)
             end_time = time.time()
             
             result['reachable'] = True
@@ -97,7 +170,7 @@ class CameraDiagnostics:
         Returns:
             Dictionary with quality metrics
         """
-        import cv2
+        cv2 = _cv2_mod()
         
         result = {
             'stream_url': stream_url,
@@ -115,19 +188,22 @@ class CameraDiagnostics:
                 result['error'] = 'Failed to open stream'
                 return result
             
+            # Measure live frames rather than a backlog of buffered ones
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
             start_time = time.time()
             frame_count = 0
             failed_count = 0
             
             while (time.time() - start_time) < duration:
+                # read() blocks until the next frame arrives, which paces the loop
                 ret, frame = cap.read()
                 if ret and frame is not None:
                     frame_count += 1
                 else:
                     failed_count += 1
-                
-                # Brief delay to not hammer the stream
-                time.sleep(0.01)
+                    # Back off briefly so a failing stream is not hammered
+                    time.sleep(0.01)
             
             end_time = time.time()
             actual_duration = end_time - start_time
@@ -167,7 +243,7 @@ class CameraDiagnostics:
         }
         
         try:
-            response = requests.get(status_url, timeout=timeout)
+            response = SESSION.get(status_url, timeout=timeout)
             if response.status_code == 200:
                 result['available'] = True
                 # Try to parse HTML for device info
@@ -188,6 +264,9 @@ class CameraDiagnostics:
         """
         Run comprehensive diagnostics on a camera.
         
+        The ping, HTTP and camera info checks are independent, so they run
+        concurrently and take as long as the slowest one.
+        
         Args:
             ip: Camera IP address
             port: Camera port
@@ -200,14 +279,21 @@ class CameraDiagnostics:
         
         logger.info(f"Running full diagnostics on {ip}:{port}")
         
+        timestamp = datetime.now().isoformat()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            ping_test = executor.submit(CameraDiagnostics.cached_ping, ip, port)
+            http_status = executor.submit(CameraDiagnostics.check_http_status, status_url)
+            stream_status = executor.submit(CameraDiagnostics.check_http_status, stream_url)
+            camera_info = executor.submit(CameraDiagnostics.get_camera_info, status_url)
+        
         diagnostics = {
             'camera_ip': ip,
             'camera_port': port,
-            'timestamp': datetime.now().isoformat(),
-            'ping_test': CameraDiagnostics.ping_camera(ip, port),
-            'http_status': CameraDiagnostics.check_http_status(status_url),
-            'stream_status': CameraDiagnostics.check_http_status(stream_url),
-            'camera_info': CameraDiagnostics.get_camera_info(status_url)
+            'timestamp': timestamp,
+            'ping_test': ping_test.result(),
+            'http_status': http_status.result(),
+            'stream_status': stream_status.result(),
+            'camera_info': camera_info.result()
         }
         
         # Only test stream quality if basic checks pass
@@ -217,6 +303,55 @@ class CameraDiagnostics:
             diagnostics['stream_quality'] = {'error': 'Skipped - camera not reachable'}
         
         return diagnostics
+    
+    @staticmethod
+    async def run_full_diagnostics_async(ip: str, port: int = 80) -> Dict[str, any]:
+        """
+        Run comprehensive diagnostics on a camera without blocking the event loop.
+        
+        The ping, HTTP and camera info checks are independent, so they run
+        concurrently on worker threads and take as long as the slowest one.
+        Diagnose several cameras at once with asyncio.gather.
+        
+        Args:
+            ip: Camera IP address
+            port: Camera port
+            
+        Returns:
+            Dictionary with all diagnostic results
+        """
+        stream_url = f"http://{ip}:{port}/stream"
+        status_url = f"http://{ip}:{port}/"
+        
+        logger.info(f"Running full diagnostics on {ip}:{port}")
+        
+        timestamp = datetime.now().isoformat()
+        ping_test, http_status, stream_status, camera_info = await asyncio.gather(
+            asyncio.to_thread(CameraDiagnostics.cached_ping, ip, port),
+            asyncio.to_thread(CameraDiagnostics.check_http_status, status_url),
+            asyncio.to_thread(CameraDiagnostics.check_http_status, stream_url),
+            asyncio.to_thread(CameraDiagnostics.get_camera_info, status_url),
+        )
+        
+        diagnostics = {
+            'camera_ip': ip,
+            'camera_port': port,
+            'timestamp': timestamp,
+            'ping_test': ping_test,
+            'http_status': http_status,
+            'stream_status': stream_status,
+            'camera_info': camera_info
+        }
+        
+        # Only test stream quality if basic checks pass
+        if ping_test and stream_status['reachable']:
+            diagnostics['stream_quality'] = await asyncio.to_thread(
+                CameraDiagnostics.test_stream_quality, stream_url, duration=5
+            )
+        else:
+            diagnostics['stream_quality'] = {'error': 'Skipped - camera not reachable'}
+        
+        return diagnostics
 
 
 class NetworkDiagnostics:
@@ -235,26 +370,41 @@ class NetworkDiagnostics:
             return "127.0.0.1"
     
     @staticmethod
-    def scan_subnet(subnet: str, port: int = 80, timeout: float = 0.5) -> List[str]:
+    def scan_subnet(subnet: str, port: int = 80, timeout: float = 0.5,
+                    concurrency: int = 254) -> List[str]:
         """
         Scan subnet for ESP32-CAM devices.
         
+        Hosts are probed concurrently with ping_many, so a full /24 scan
+        takes roughly one timeout window instead of one timeout per host.
+        This machine's own address is not probed.
+        
         Args:
             subnet: Subnet to scan (e.g., "192.168.2")
             port: Port to check
             timeout: Timeout per host
+            concurrency: Maximum number of simultaneous connection attempts
             
         Returns:
             List of reachable IP addresses
+            
+        Raises:
+            ValueError: If subnet is not the first three octets of an IPv4 address
         """
-        reachable_hosts = []
+        # Validate once up front so no probe ever falls back to name resolution
+        network = ipaddress.IPv4Network(f"{subnet}.0/24")
         
-        logger.info(f"Scanning subnet {subnet}.0/24 on port {port}")
+        logger.info(f"Scanning subnet {network} on port {port}")
+        
+        local_ip = NetworkDiagnostics.get_local_ip()
+        ips = [str(host) for host in network.hosts() if str(host) != local_ip]
+        batch_size = max(1, concurrency)
+        reachable_hosts = []
+        for start in range(0, len(ips), batch_size):
+            results = CameraDiagnostics.ping_many(ips[start:start + batch_size], port, timeout)
+            reachable_hosts.extend(ip for ip, ok in results.items() if ok)
         
-        for i in range(1, 255):
-            ip = f"{subnet}.{i}"
-            if CameraDiagnostics.ping_camera(ip, port, timeout):
-                reachable_hosts.append(ip)
-                logger.info(f"Found device at {ip}")
+        for ip in reachable_hosts:
+            logger.info(f"Found device at {ip}")
         
         return reachable_hosts
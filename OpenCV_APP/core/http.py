@@ -0,0 +1,74 @@
+"""
+Shared HTTP session for ESP32-CAM requests.
+
+ESP32-CAM devices only have a handful of sockets, so HTTP requests made by
+the application share one connection-pooling session instead of opening a
+fresh TCP connection per request.
+"""
+
+import atexit
+import logging
+import socket
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Connection pool sizing: one pool per camera host, a few sockets per pool.
+# Subnet discovery probes many hosts at once, so enough host pools are kept
+# for its workers not to evict each other's connections.
+POOL_CONNECTIONS = 64
+POOL_MAXSIZE = 16
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTP adapter for short camera requests: no retries, no Nagle delay."""
+    
+    # urllib3's defaults already set TCP_NODELAY; TCP keep-alive is added so
+    # pooled connections to a camera that went away get detected
+    SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+    
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_retries', Retry(total=0, connect=0, read=0))
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = self.SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+def create_session(pool_connections: int = POOL_CONNECTIONS,
+                   pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
+    """
+    Create a requests session with keep-alive connection pooling.
+    
+    Args:
+        pool_connections: Number of host pools to cache
+        pool_maxsize: Maximum number of connections kept per host
+    
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    adapter = KeepAliveAdapter(pool_connections=pool_connections,
+                               pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+SESSION = create_session()
+
+
+def close_session():
+    """Close pooled connections so cameras can release their sockets."""
+    SESSION.close()
+    logger.debug("Closed shared HTTP session")
+
+
+atexit.register(close_session)
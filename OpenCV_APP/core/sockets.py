@@ -0,0 +1,80 @@
+"""
+Concurrent TCP connects for ESP32-CAM reachability checks.
+
+Checking many cameras (or a whole subnet) one blocking connect at a time
+costs a timeout per silent host. The helper here starts every connect at
+once and waits for all of them on a single selector.
+"""
+
+import errno
+import logging
+import selectors
+import socket
+import time
+from typing import Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# connect_ex() results meaning the handshake is still in progress
+_CONNECT_PENDING = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY)
+
+
+def open_connections(hosts: List[str], port: int,
+                     timeout: float) -> Iterator[Tuple[int, socket.socket]]:
+    """
+    Connect to a port on several hosts at once.
+    
+    Non-blocking connects are started for every host and waited on with a
+    single selector loop (epoll/kqueue where available), so the whole call
+    takes at most one timeout on one thread.
+    
+    Args:
+        hosts: Host IP addresses
+        port: Port number
+        timeout: Connection timeout in seconds for all hosts together
+        
+    Yields:
+        (index into hosts, connected non-blocking socket); the caller closes
+        each socket it receives
+    """
+    selector = selectors.DefaultSelector()
+    try:
+        for index, host in enumerate(hosts):
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            except OSError as e:
+                logger.error(f"Error connecting to {host}:{port} - {e}")
+                continue
+            
+            sock.setblocking(False)
+            try:
+                result = sock.connect_ex((host, port))
+            except OSError as e:
+                logger.debug(f"Connect to {host}:{port} failed - {e}")
+                result = None
+            
+            if result in _CONNECT_PENDING:
+                selector.register(sock, selectors.EVENT_WRITE, index)
+            elif result == 0:
+                yield index, sock
+            else:
+                sock.close()
+        
+        # A connecting socket becomes writable once it succeeds or fails
+        deadline = time.monotonic() + timeout
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                sock = key.fileobj
+                selector.unregister(sock)
+                if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    yield key.data, sock
+                else:
+                    sock.close()
+    finally:
+        # Hosts that did not answer in time count as unreachable
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
@@ -6,15 +6,17 @@ Tests camera connection, frame capture, and error handling.
 
 import unittest
 from unittest.mock import Mock, patch, MagicMock
+import cv2
 import numpy as np
+import os
 import sys
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add repository root to path; the packages use package-relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from core import ESP32Camera, MockCamera, CameraConfig
-from core.connection_manager import ConnectionManager
+from OpenCV_APP.core import ESP32Camera, MockCamera, CameraConfig
+from OpenCV_APP.core.connection_manager import ConnectionManager
 
 
 class TestMockCamera(unittest.TestCase):
@@ -45,6 +47,33 @@ class TestMockCamera(unittest.TestCase):
         self.assertIsNotNone(frame)
         self.assertEqual(frame.shape, (240, 320, 3))
     
+    def test_mock_camera_frames_change(self):
+        """Test that consecutive mock frames change color."""
+        camera = MockCamera("TestCam", width=320, height=240)
+        camera.connect()
+        
+        _, frame = camera.read()
+        self.assertEqual(frame[-1, -1].tolist(), [0, 128, 255])
+        
+        _, frame = camera.read()
+        self.assertEqual(frame[-1, -1].tolist(), [1, 128, 254])
+        
+        # Text overlay from the previous frame does not linger
+        expected = np.zeros((240, 320, 3), dtype=np.uint8)
+        expected[:, :] = [1, 128, 254]
+        cv2.putText(expected, "TestCam - Frame 1", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        np.testing.assert_array_equal(frame, expected)
+    
+    def test_mock_camera_odd_width_frames(self):
+        """Test frame colors for widths outside the packed fill path."""
+        camera = MockCamera("TestCam", width=322, height=10)
+        camera.connect()
+        
+        camera.read()
+        _, frame = camera.read()
+        self.assertTrue((frame[-1] == [1, 128, 254]).all())
+    
     def test_mock_camera_disconnect(self):
         """Test disconnecting mock camera."""
         camera = MockCamera("TestCam")
@@ -65,15 +94,9 @@ class TestESP32Camera(unittest.TestCase):
         self.assertEqual(camera.stream_url, "http://192.168.1.100/stream")
         self.assertFalse(camera.is_connected)
     
-    @patch('requests.get')
     @patch('cv2.VideoCapture')
-    def test_camera_connect_success(self, mock_video_capture, mock_requests_get):
+    def test_camera_connect_success(self, mock_video_capture):
         """Test successful camera connection."""
-        # Mock HTTP response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_requests_get.return_value = mock_response
-        
         # Mock VideoCapture
         mock_cap = MagicMock()
         mock_cap.isOpened.return_value = True
@@ -85,14 +108,51 @@ class TestESP32Camera(unittest.TestCase):
         
         self.assertTrue(result)
         self.assertTrue(camera.is_connected)
+        mock_video_capture.assert_called_once()
+        url, _, params = mock_video_capture.call_args.args
+        self.assertEqual(url, "http://192.168.1.100/stream")
+        self.assertIn(5000, params)
+        mock_cap.read.assert_not_called()
+    
+    @patch('cv2.VideoCapture')
+    def test_camera_connect_sets_low_latency_options(self, mock_video_capture):
+        """Test that FFmpeg buffering is disabled unless the user configured it."""
+        mock_video_capture.return_value.isOpened.return_value = True
+        camera = ESP32Camera("TestCam", "http://192.168.1.100/stream")
+        
+        with patch.dict('os.environ', clear=True):
+            camera.connect()
+            self.assertEqual(os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"],
+                             "fflags;nobuffer|flags;low_delay")
+        
+        with patch.dict('os.environ', {"OPENCV_FFMPEG_CAPTURE_OPTIONS": "rtsp_transport;tcp"}):
+            camera.connect()
+            self.assertEqual(os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"], "rtsp_transport;tcp")
+        
+        mock_video_capture.return_value.set.assert_called_with(cv2.CAP_PROP_BUFFERSIZE, 1)
     
-    @patch('requests.get')
-    def test_camera_connect_failure(self, mock_requests_get):
+    @patch('cv2.VideoCapture')
+    def test_camera_connect_verify_failure(self, mock_video_capture):
+        """Test connection with frame verification when no frame arrives."""
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.read.return_value = (False, None)
+        mock_video_capture.return_value = mock_cap
+        
+        camera = ESP32Camera("TestCam", "http://192.168.1.100/stream")
+        result = camera.connect(verify=True)
+        
+        self.assertFalse(result)
+        self.assertFalse(camera.is_connected)
+        mock_cap.release.assert_called_once()
+    
+    @patch('cv2.VideoCapture')
+    def test_camera_connect_failure(self, mock_video_capture):
         """Test failed camera connection."""
-        # Mock failed HTTP response
-        mock_response = Mock()
-        mock_response.status_code = 404
-        mock_requests_get.return_value = mock_response
+        # Mock unreachable camera
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = False
+        mock_video_capture.return_value = mock_cap
         
         camera = ESP32Camera("TestCam", "http://192.168.1.100/stream")
         result = camera.connect()
@@ -100,6 +160,45 @@ class TestESP32Camera(unittest.TestCase):
         self.assertFalse(result)
         self.assertFalse(camera.is_connected)
     
+    @patch('cv2.VideoCapture')
+    def test_camera_grab_then_retrieve(self, mock_video_capture):
+        """Test that only retrieved frames are decoded and counted."""
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.grab.return_value = True
+        mock_cap.retrieve.return_value = (True, np.zeros((480, 640, 3), dtype=np.uint8))
+        mock_video_capture.return_value = mock_cap
+        
+        camera = ESP32Camera("TestCam", "http://192.168.1.100/stream")
+        camera.connect()
+        
+        self.assertTrue(camera.grab())
+        self.assertTrue(camera.grab())
+        ret, frame = camera.retrieve()
+        
+        self.assertTrue(ret)
+        self.assertEqual(frame.shape, (480, 640, 3))
+        self.assertEqual(mock_cap.retrieve.call_count, 1)
+        self.assertEqual(camera.get_frame_count(), 1)
+        self.assertIsNotNone(camera.last_read_ts)
+    
+    @patch('cv2.VideoCapture')
+    def test_camera_retrieve_reuses_buffer(self, mock_video_capture):
+        """Test that retrieve() decodes into the previous frame's array."""
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        mock_cap = MagicMock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.retrieve.return_value = (True, frame)
+        mock_video_capture.return_value = mock_cap
+        
+        camera = ESP32Camera("TestCam", "http://192.168.1.100/stream")
+        camera.connect()
+        camera.retrieve()
+        camera.retrieve()
+        
+        self.assertEqual([call.args for call in mock_cap.retrieve.call_args_list],
+                         [(None,), (frame,)])
+    
     def test_camera_read_not_connected(self):
         """Test reading from disconnected camera."""
         camera = ESP32Camera("TestCam", "http://192.168.1.100/stream")
@@ -147,6 +246,95 @@ class TestConnectionManager(unittest.TestCase):
         self.assertTrue(result)
         self.assertTrue(camera.is_connected)
     
+    @patch('OpenCV_APP.core.connection_manager.time.sleep')
+    def test_connect_camera_backs_off_exponentially(self, mock_sleep):
+        """Test that retry delays double and are capped."""
+        manager = ConnectionManager(retry_attempts=5, retry_delay=1,
+                                    retry_max_delay=3, retry_jitter=0)
+        camera = MockCamera("TestCam")
+        camera.connect = MagicMock(return_value=False)
+        manager.add_camera(camera)
+        
+        self.assertFalse(manager.connect_camera("TestCam"))
+        
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        self.assertEqual(delays, [1, 2, 3, 3])
+    
+    @patch('OpenCV_APP.core.connection_manager.time.sleep')
+    @patch('OpenCV_APP.core.connection_manager.socket.getaddrinfo')
+    def test_connect_camera_stops_on_unrecoverable_error(self, mock_resolve, mock_sleep):
+        """Test that an unresolvable host or invalid URL is not retried."""
+        import socket
+        mock_resolve.side_effect = socket.gaierror(socket.EAI_NONAME, "Name not known")
+        manager = ConnectionManager(retry_attempts=3, retry_delay=1)
+        for name, url in (("Unknown", "http://esp32-cam.invalid:81/stream"),
+                          ("BadPort", "http://192.168.1.100:99999/stream")):
+            camera = ESP32Camera(name, url)
+            camera.connect = MagicMock(return_value=False)
+            manager.add_camera(camera)
+            
+            self.assertFalse(manager.connect_camera(name))
+            
+            camera.connect.assert_not_called()
+            self.assertEqual(manager.get_connection_stats(name)['failures'], 1)
+        mock_sleep.assert_not_called()
+        mock_resolve.assert_called_once_with("esp32-cam.invalid", 81, type=socket.SOCK_STREAM)
+    
+    @patch('OpenCV_APP.core.connection_manager.time.sleep')
+    @patch('OpenCV_APP.core.connection_manager.socket.getaddrinfo')
+    def test_connect_camera_retries_temporary_resolver_failure(self, mock_resolve, mock_sleep):
+        """Test that a temporary DNS failure still gets the normal retries."""
+        import socket
+        mock_resolve.side_effect = socket.gaierror(socket.EAI_AGAIN, "Try again")
+        manager = ConnectionManager(retry_attempts=2, retry_delay=0)
+        camera = ESP32Camera("TestCam", "http://esp32-cam.local:81/stream")
+        camera.connect = MagicMock(side_effect=[False, True])
+        manager.add_camera(camera)
+        
+        self.assertTrue(manager.connect_camera("TestCam"))
+        self.assertEqual(camera.connect.call_count, 2)
+    
+    @patch('OpenCV_APP.core.connection_manager.time.sleep')
+    def test_connect_camera_fails_fast_after_repeated_failures(self, mock_sleep):
+        """Test that a camera known to be down is not retried during the cooldown."""
+        manager = ConnectionManager(retry_attempts=3, retry_delay=0,
+                                    failure_threshold=3, failure_cooldown=60)
+        camera = MockCamera("TestCam")
+        camera.connect = MagicMock(return_value=False)
+        manager.add_camera(camera)
+        
+        # Each call counts as one failure, however many attempts it made
+        for _ in range(3):
+            self.assertFalse(manager.connect_camera("TestCam"))
+        self.assertEqual(camera.connect.call_count, 9)
+        
+        self.assertFalse(manager.connect_camera("TestCam"))
+        self.assertFalse(manager.reconnect_camera("TestCam"))
+        self.assertEqual(camera.connect.call_count, 9)
+        
+        # After the cooldown the camera is tried again, and success resets the count
+        stats = manager.get_connection_stats("TestCam")
+        stats['last_failure_ts'] -= 60
+        camera.connect.return_value = True
+        self.assertTrue(manager.connect_camera("TestCam"))
+        self.assertEqual(stats['consecutive_failures'], 0)
+    
+    @patch('OpenCV_APP.core.connection_manager.time.sleep')
+    @patch('OpenCV_APP.core.connection_manager.CameraDiagnostics.ping_camera')
+    def test_reconnect_waits_until_reachable(self, mock_ping, mock_sleep):
+        """Test that reconnecting polls the camera instead of sleeping a fixed time."""
+        mock_ping.side_effect = [False, True]
+        manager = ConnectionManager()
+        camera = ESP32Camera("TestCam", "http://192.168.1.100:81/stream")
+        camera.connect = MagicMock(return_value=True)
+        manager.add_camera(camera)
+        
+        self.assertTrue(manager.reconnect_camera("TestCam"))
+        
+        self.assertEqual(mock_ping.call_count, 2)
+        mock_ping.assert_called_with("192.168.1.100", 81, 0.1)
+        mock_sleep.assert_called_once_with(0.1)
+    
     def test_get_connected_cameras(self):
         """Test getting list of connected cameras."""
         manager = ConnectionManager()
@@ -164,6 +352,23 @@ class TestConnectionManager(unittest.TestCase):
         self.assertIn("Cam1", connected)
         self.assertNotIn("Cam2", connected)
     
+    def test_health_check_only_reads_connected_cameras(self):
+        """Test that disconnected cameras are reported without being read."""
+        manager = ConnectionManager()
+        cam1 = MockCamera("Cam1")
+        cam2 = MockCamera("Cam2")
+        manager.add_camera(cam1)
+        manager.add_camera(cam2)
+        manager.connect_camera("Cam1")
+        
+        with patch.object(manager, '_for_each_camera',
+                          wraps=manager._for_each_camera) as mock_for_each:
+            health = manager.health_check(use_cache=False, freshness=0)
+        
+        self.assertEqual(health, {"Cam1": True, "Cam2": False})
+        mock_for_each.assert_called_once()
+        self.assertEqual(mock_for_each.call_args.args[1], ["Cam1"])
+    
     def test_disconnect_all(self):
         """Test disconnecting all cameras."""
         manager = ConnectionManager()
@@ -180,6 +385,26 @@ class TestConnectionManager(unittest.TestCase):
         manager.disconnect_all()
         
         self.assertEqual(len(manager.get_connected_cameras()), 0)
+    
+    def test_connect_all_runs_in_parallel(self):
+        """Test that connect_all connects cameras concurrently."""
+        import threading
+        barrier = threading.Barrier(3, timeout=5)
+        
+        class BarrierCamera(MockCamera):
+            # Each connect waits for the others, so this only passes in parallel
+            def connect(self):
+                barrier.wait()
+                return super().connect()
+        
+        manager = ConnectionManager()
+        for i in range(3):
+            manager.add_camera(BarrierCamera(f"Cam{i}"))
+        
+        results = manager.connect_all()
+        
+        self.assertEqual(results, {"Cam0": True, "Cam1": True, "Cam2": True})
+        self.assertEqual(len(manager.get_connected_cameras()), 3)
 
 
 if __name__ == '__main__':
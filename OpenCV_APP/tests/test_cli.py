@@ -0,0 +1,178 @@
+"""
+Unit tests for the command-line interface.
+
+Tests diagnostic commands with mocked camera diagnostics.
+"""
+
+import unittest
+from unittest.mock import patch
+import json
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from click.testing import CliRunner
+
+# Add repository root to path; the CLI imports the OpenCV_APP package
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from OpenCV_APP.core import reset_config
+from OpenCV_APP.cli import diagnostic_cli, main_cli
+from OpenCV_APP.utils import uninstall_dns_cache
+
+
+def fake_diagnostics(ip, port=80):
+    """Return a passing diagnostic result without touching the network."""
+    return {
+        'camera_ip': ip,
+        'camera_port': port,
+        'timestamp': '2024-01-01T00:00:00',
+        'ping_test': True,
+        'http_status': {'reachable': True, 'status_code': 200, 'response_time': 1.0},
+        'stream_status': {'reachable': True, 'status_code': 200, 'response_time': 1.0},
+        'camera_info': {'available': True},
+        'stream_quality': {'error': 'Skipped - camera not reachable'}
+    }
+
+
+class TestDiagnosticCache(unittest.TestCase):
+    """Test cases for the diagnostic result cache."""
+    
+    def setUp(self):
+        """Redirect the cache file to a temporary directory."""
+        reset_config()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        cache_patcher = patch.object(diagnostic_cli, 'CACHE_FILE',
+                                     Path(self.temp_dir.name) / "diag.json")
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+        self.addCleanup(uninstall_dns_cache)
+        self.runner = CliRunner()
+    
+    def tearDown(self):
+        """Cleanup temporary directory."""
+        reset_config()
+        self.temp_dir.cleanup()
+    
+    @patch.object(diagnostic_cli.CameraDiagnostics, 'run_full_diagnostics',
+                  side_effect=fake_diagnostics)
+    def test_repeat_run_uses_cache(self, mock_diagnostics):
+        """Test that a repeated run reuses cached results."""
+        result = self.runner.invoke(diagnostic_cli.cli, ['test-all'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        first_calls = mock_diagnostics.call_count
+        self.assertGreater(first_calls, 0)
+        
+        result = self.runner.invoke(diagnostic_cli.cli, ['test-all'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(mock_diagnostics.call_count, first_calls)
+    
+    @patch.object(diagnostic_cli.CameraDiagnostics, 'run_full_diagnostics',
+                  side_effect=fake_diagnostics)
+    def test_no_cache_forces_refresh(self, mock_diagnostics):
+        """Test that --no-cache re-runs diagnostics."""
+        self.runner.invoke(diagnostic_cli.cli, ['test-camera'])
+        self.assertEqual(mock_diagnostics.call_count, 1)
+        
+        self.runner.invoke(diagnostic_cli.cli, ['test-camera', '--no-cache'])
+        self.assertEqual(mock_diagnostics.call_count, 2)
+    
+    def test_expired_entry_ignored(self):
+        """Test that cache entries older than the TTL are ignored."""
+        diagnostic_cli._cache_put("cam", {'ping_test': True})
+        
+        self.assertEqual(diagnostic_cli._cache_get("cam"), {'ping_test': True})
+        self.assertIsNone(diagnostic_cli._cache_get("cam", ttl=0))
+
+
+
+class TestFullReport(unittest.TestCase):
+    """Test cases for the full-report command."""
+    
+    def setUp(self):
+        """Setup temporary directory for the report and cache."""
+        reset_config()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        cache_patcher = patch.object(diagnostic_cli, 'CACHE_FILE',
+                                     Path(self.temp_dir.name) / "diag.json")
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+        self.addCleanup(uninstall_dns_cache)
+        self.runner = CliRunner()
+    
+    def tearDown(self):
+        """Cleanup temporary directory."""
+        reset_config()
+        self.temp_dir.cleanup()
+    
+    @patch.object(diagnostic_cli.CameraDiagnostics, 'run_full_diagnostics',
+                  side_effect=fake_diagnostics)
+    def test_report_only_probes_configured_cameras(self, mock_diagnostics):
+        """Test that the report timestamp does not cost a diagnostic run."""
+        output = Path(self.temp_dir.name) / "report.json"
+        
+        result = self.runner.invoke(diagnostic_cli.cli, ['full-report', '-o', str(output)])
+        self.assertEqual(result.exit_code, 0, result.output)
+        
+        probed = [call.args[0] for call in mock_diagnostics.call_args_list]
+        self.assertNotIn("127.0.0.1", probed)
+        
+        with open(output) as f:
+            report = json.load(f)
+        datetime.fromisoformat(report['timestamp'])
+        self.assertEqual(list(report['cameras']), ["ESP32_CAM_1", "ESP32_CAM_2"])
+        self.assertEqual(len(probed), len(report['cameras']))
+
+
+class TestMainCli(unittest.TestCase):
+    """Test cases for the main CLI entry point."""
+    
+    def setUp(self):
+        """Redirect the diagnostic cache to a temporary directory."""
+        reset_config()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        cache_patcher = patch.object(diagnostic_cli, 'CACHE_FILE',
+                                     Path(self.temp_dir.name) / "diag.json")
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+        self.addCleanup(uninstall_dns_cache)
+        self.runner = CliRunner()
+    
+    def tearDown(self):
+        """Cleanup temporary directory."""
+        reset_config()
+        self.temp_dir.cleanup()
+    
+    @patch.object(diagnostic_cli.CameraDiagnostics, 'run_full_diagnostics',
+                  side_effect=fake_diagnostics)
+    def test_diagnose_runs_test_all_in_process(self, mock_diagnostics):
+        """Test that diagnose runs test-all without re-entering the CLI."""
+        argv = list(sys.argv)
+        
+        result = self.runner.invoke(main_cli.cli, ['diagnose', '--no-cache'])
+        
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Testing all configured cameras", result.output)
+        self.assertEqual(mock_diagnostics.call_count, 2)
+        self.assertEqual(sys.argv, argv)
+    
+    def test_existing_logging_handlers_kept(self):
+        """Test that the CLI only adjusts the level of configured logging."""
+        import logging
+        root_logger = logging.getLogger()
+        handler = logging.NullHandler()
+        root_logger.addHandler(handler)
+        self.addCleanup(root_logger.removeHandler, handler)
+        self.addCleanup(root_logger.setLevel, root_logger.level)
+        handlers = list(root_logger.handlers)
+        
+        result = self.runner.invoke(main_cli.cli, ['--verbose', 'config-info'])
+        
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(root_logger.handlers, handlers)
+        self.assertEqual(root_logger.level, logging.DEBUG)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,12 +11,13 @@ from pathlib import Path
 import tempfile
 import os
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add repository root to path; the packages use package-relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from core import get_config, reset_config, ConnectionManager, MockCamera
-from utils import FrameCapture
+from OpenCV_APP.core import get_config, reset_config, ConnectionManager, MockCamera
+from OpenCV_APP.utils import FrameCapture
 import numpy as np
+import cv2
 
 
 class TestConfigurationIntegration(unittest.TestCase):
@@ -60,6 +61,50 @@ class TestConfigurationIntegration(unittest.TestCase):
         # Cleanup
         del os.environ['ESP32_CAM_1_IP']
         del os.environ['ESP32_CAM_2_IP']
+    
+    def test_yaml_parsed_once_per_modification(self):
+        """Test that an unchanged YAML file is only parsed once."""
+        from OpenCV_APP.core.config import AppConfig
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = os.path.join(temp_dir, "cameras.yaml")
+            with open(config_file, 'w') as f:
+                f.write("cameras:\n  - name: CAM_A\n    ip: 10.0.0.5\n")
+            
+            with patch('OpenCV_APP.core.config.yaml.load', wraps=__import__('yaml').load) as mock_load:
+                first = AppConfig(config_file)
+                second = AppConfig(config_file)
+                self.assertEqual(mock_load.call_count, 1)
+                
+                # A modified file is parsed again
+                stat = os.stat(config_file)
+                with open(config_file, 'w') as f:
+                    f.write("cameras:\n  - name: CAM_A\n    ip: 10.0.0.6\n")
+                os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+                third = AppConfig(config_file)
+                self.assertEqual(mock_load.call_count, 2)
+        
+        self.assertEqual(first.get_camera("CAM_A").ip, "10.0.0.5")
+        self.assertEqual(second.get_camera("CAM_A").ip, "10.0.0.5")
+        self.assertEqual(third.get_camera("CAM_A").ip, "10.0.0.6")
+    
+    def test_config_and_diagnostics_do_not_import_opencv(self):
+        """Test that configuration and diagnostics load without OpenCV."""
+        import subprocess
+        code = ("import sys; from OpenCV_APP import core; core.get_config; core.CameraDiagnostics; "
+                "sys.exit('cv2' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code],
+                                cwd=str(Path(__file__).parent.parent.parent))
+        self.assertEqual(result.returncode, 0)
+    
+    def test_concurrent_get_config_returns_one_instance(self):
+        """Test that threads racing on first access share one configuration."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            configs = list(executor.map(lambda _: get_config(), range(32)))
+        
+        self.assertTrue(all(config is configs[0] for config in configs))
 
 
 class TestConnectionManagerIntegration(unittest.TestCase):
@@ -109,6 +154,44 @@ class TestConnectionManagerIntegration(unittest.TestCase):
         self.assertTrue(health["Cam1"])
         self.assertTrue(health["Cam2"])
     
+    def test_health_check_cached(self):
+        """Test that repeated health checks reuse recent results."""
+        cam = MockCamera("Cam1")
+        self.manager.add_camera(cam)
+        self.manager.connect_camera("Cam1")
+        
+        with patch.object(cam, 'read', wraps=cam.read) as mock_read:
+            self.manager.health_check(freshness=0)
+            self.manager.health_check()
+            self.assertEqual(mock_read.call_count, 1)
+            
+            # Bypassing the cache or filtering by name reads again
+            self.manager.health_check(use_cache=False, freshness=0)
+            self.manager.health_check(names=["Cam1"], freshness=0)
+            self.assertEqual(mock_read.call_count, 3)
+        
+        # Disconnecting through the manager invalidates cached results
+        self.manager.disconnect_camera("Cam1")
+        self.assertFalse(self.manager.health_check()["Cam1"])
+    
+    def test_health_check_uses_recent_read(self):
+        """Test that a camera read moments ago is not read again."""
+        cam = MockCamera("Cam1")
+        self.manager.add_camera(cam)
+        self.manager.connect_camera("Cam1")
+        cam.read()
+        
+        with patch.object(cam, 'read', wraps=cam.read) as mock_read:
+            health = self.manager.health_check(freshness=60)
+            mock_read.assert_not_called()
+            
+            # A stale read falls back to reading a frame
+            cam.last_read_ts -= 120
+            self.manager.health_check(use_cache=False, freshness=60)
+            mock_read.assert_called_once()
+        
+        self.assertTrue(health["Cam1"])
+    
     def test_reconnect_camera(self):
         """Test reconnecting a camera."""
         cam = MockCamera("TestCam")
@@ -126,55 +209,146 @@ class TestConnectionManagerIntegration(unittest.TestCase):
         self.assertTrue(cam.is_connected)
 
 
+class MemoryWriter:
+    """FrameCapture writer that keeps JPEG-encoded images in memory."""
+    
+    def __init__(self):
+        self.files = {}
+    
+    def __call__(self, path, frame):
+        ok, buffer = cv2.imencode('.jpg', frame)
+        self.files[path] = buffer.tobytes()
+        return ok
+
+
 class TestFrameCaptureIntegration(unittest.TestCase):
     """Integration tests for frame capture functionality."""
     
-    def setUp(self):
-        """Setup temporary directory for captures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.frame_capture = FrameCapture(output_dir=self.temp_dir)
+    @classmethod
+    def setUpClass(cls):
+        """Build the test frames once; they are read-only so no test can change them."""
+        cls.blue_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        cls.blue_frame[:, :] = [255, 0, 0]
+        cls.green_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        cls.green_frame[:, :] = [0, 255, 0]
+        cls.black_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        for frame in (cls.blue_frame, cls.green_frame, cls.black_frame):
+            frame.setflags(write=False)
     
-    def tearDown(self):
-        """Cleanup temporary directory."""
-        import shutil
-        if os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
+    def setUp(self):
+        """Setup frame capture with an in-memory writer."""
+        self.writer = MemoryWriter()
+        self.frame_capture = FrameCapture(output_dir="captures", writer=self.writer)
     
     def test_save_frame(self):
         """Test saving a single frame."""
-        # Create a test frame
-        frame = np.zeros((480, 640, 3), dtype=np.uint8)
-        frame[:, :] = [255, 0, 0]  # Blue frame
-        
         # Save frame
-        path = self.frame_capture.save_frame(frame, "TestCam")
+        path = self.frame_capture.save_frame(self.blue_frame, "TestCam")
         
         self.assertIsNotNone(path)
-        self.assertTrue(os.path.exists(path))
+        self.assertEqual(list(self.writer.files), [path])
+        decoded = cv2.imdecode(np.frombuffer(self.writer.files[path], np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(decoded.shape, (480, 640, 3))
+    
+    def test_save_frame_with_timestamp(self):
+        """Test that a caller-supplied timestamp is used in the file name."""
+        path = self.frame_capture.save_frame(self.blue_frame, "TestCam",
+                                             timestamp="20240101_000000_000")
+        
+        self.assertEqual(Path(path).name, "TestCam_20240101_000000_000.jpg")
+        self.assertIn(path, self.writer.files)
     
     def test_save_frame_pair(self):
         """Test saving a pair of frames."""
-        frame1 = np.zeros((480, 640, 3), dtype=np.uint8)
-        frame1[:, :] = [255, 0, 0]
-        
-        frame2 = np.zeros((480, 640, 3), dtype=np.uint8)
-        frame2[:, :] = [0, 255, 0]
-        
-        path1, path2 = self.frame_capture.save_frame_pair(frame1, frame2, "Cam1", "Cam2")
+        path1, path2 = self.frame_capture.save_frame_pair(
+            self.blue_frame, self.green_frame, "Cam1", "Cam2"
+        )
         
         self.assertIsNotNone(path1)
         self.assertIsNotNone(path2)
-        self.assertTrue(os.path.exists(path1))
-        self.assertTrue(os.path.exists(path2))
+        self.assertEqual(set(self.writer.files), {path1, path2})
+        self.assertTrue(all(self.writer.files.values()))
     
     def test_save_annotated_frame(self):
         """Test saving an annotated frame."""
-        frame = np.zeros((480, 640, 3), dtype=np.uint8)
-        
-        path = self.frame_capture.save_annotated_frame(frame, "TestCam", "Test Annotation")
+        path = self.frame_capture.save_annotated_frame(self.black_frame, "TestCam", "Test Annotation")
         
         self.assertIsNotNone(path)
-        self.assertTrue(os.path.exists(path))
+        self.assertIn(path, self.writer.files)
+        # The annotation is drawn on a copy, which differs from the plain frame
+        plain = cv2.imencode('.jpg', self.black_frame)[1].tobytes()
+        self.assertNotEqual(self.writer.files[path], plain)
+    
+    def test_save_annotated_frame_in_place(self):
+        """Test that in-place annotation draws on the caller's frame."""
+        frame = self.black_frame.copy()
+        
+        path = self.frame_capture.save_annotated_frame(frame, "TestCam", modify_in_place=True)
+        
+        self.assertIn(path, self.writer.files)
+        self.assertGreater(frame.max(), 0)
+    
+    def test_async_writes_detach_frame(self):
+        """Test that queued writes use a copy and complete on flush."""
+        frame_capture = FrameCapture(output_dir="captures", writer=self.writer,
+                                     async_writes=True)
+        frame = self.blue_frame.copy()
+        
+        path = frame_capture.save_frame(frame, "TestCam")
+        path1, path2 = frame_capture.save_frame_pair(frame, None, "Cam1", "Cam2")
+        frame[:] = 0
+        
+        self.assertTrue(frame_capture.flush())
+        self.assertIsNone(path2)
+        self.assertEqual(set(self.writer.files), {path, path1})
+        decoded = cv2.imdecode(np.frombuffer(self.writer.files[path], np.uint8), cv2.IMREAD_COLOR)
+        self.assertGreater(decoded[..., 0].mean(), 200)
+    
+    def test_close_stops_write_pool(self):
+        """Test that close() finishes queued writes and shuts the write pool down."""
+        frame_capture = FrameCapture(output_dir="captures", writer=self.writer,
+                                     async_writes=True)
+        io_pool = frame_capture._io_pool
+        
+        path = frame_capture.save_frame(self.blue_frame, "TestCam")
+        frame_capture.close()
+        
+        self.assertIn(path, self.writer.files)
+        with self.assertRaises(RuntimeError):
+            io_pool.submit(print)
+    
+    def test_default_writer_jpeg_quality(self):
+        """Test that the default writer encodes with the configured quality."""
+        noise = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+        sizes = {}
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for quality in (30, 95):
+                frame_capture = FrameCapture(output_dir=temp_dir, jpeg_quality=quality)
+                path = frame_capture.save_frame(noise, f"Q{quality}")
+                frame_capture.close()
+                
+                self.assertTrue(path.startswith(temp_dir))
+                self.assertEqual(cv2.imread(path).shape, noise.shape)
+                sizes[quality] = os.path.getsize(path)
+        
+        self.assertLess(sizes[30], sizes[95])
+    
+    def test_save_jpeg_writes_bytes_unchanged(self):
+        """Test that encoded images are written as is, in the background."""
+        jpeg = cv2.imencode('.jpg', self.blue_frame)[1].tobytes()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            frame_capture = FrameCapture(output_dir=temp_dir, async_writes=True)
+            with patch.object(cv2, 'imencode') as mock_encode:
+                path = frame_capture.save_jpeg(jpeg, "TestCam")
+                self.assertTrue(frame_capture.flush())
+            frame_capture.close()
+            
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), jpeg)
+            mock_encode.assert_not_called()
+            self.assertIsNone(frame_capture.save_jpeg(b"", "TestCam"))
 
 
 class TestEndToEndWorkflow(unittest.TestCase):
@@ -0,0 +1,288 @@
+"""
+Unit tests for MJPEG stream parsing.
+
+Tests frame extraction from in-memory multipart streams.
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add repository root to path; the packages use package-relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from OpenCV_APP.utils import MJPEGParser, RawMJPEGStream
+
+
+def make_jpeg(value):
+    """Encode a small uniform test image as JPEG bytes."""
+    image = np.full((48, 64, 3), value, dtype=np.uint8)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def make_stream(jpegs):
+    """Build an ESP32-CAM style multipart body from JPEG images."""
+    parts = []
+    for jpg in jpegs:
+        parts.append(b"--frame\r\nContent-Type: image/jpeg\r\n"
+                     b"Content-Length: " + str(len(jpg)).encode() + b"\r\n\r\n")
+        parts.append(jpg + b"\r\n")
+    return b"".join(parts)
+
+
+class FakeResponse:
+    """Streaming response whose raw reads return at most chunk_size bytes."""
+    
+    def __init__(self, body, chunk_size):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.raw = self
+    
+    def read1(self, amt):
+        size = min(amt, self.chunk_size)
+        chunk = self.body[self.offset:self.offset + size]
+        self.offset += len(chunk)
+        return chunk
+    
+    def close(self):
+        pass
+
+
+def parser_for(body, chunk_size):
+    """Create a parser reading from an in-memory body."""
+    parser = MJPEGParser("http://192.168.1.100/stream")
+    parser._stream = FakeResponse(body, chunk_size)
+    return parser
+
+
+class TestMJPEGParser(unittest.TestCase):
+    """Test cases for MJPEGParser frame extraction."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Encode the test images once."""
+        cls.values = [10, 120, 240]
+        cls.body = make_stream([make_jpeg(v) for v in cls.values])
+    
+    def assert_frames(self, frames):
+        self.assertEqual(len(frames), len(self.values))
+        for frame, value in zip(frames, self.values):
+            self.assertEqual(frame.shape, (48, 64, 3))
+            self.assertLessEqual(abs(int(frame.mean()) - value), 2)
+    
+    def test_parse_frames_across_chunk_sizes(self):
+        """Test that frames are found however the stream is chunked."""
+        # Size 1 splits every marker; the largest puts all frames in one chunk
+        for chunk_size in (1, 7, 1024, len(self.body)):
+            with self.subTest(chunk_size=chunk_size):
+                frames = list(parser_for(self.body, chunk_size).parse_frames())
+                self.assert_frames(frames)
+    
+    def test_iter_jpegs_without_copy(self):
+        """Test that uncopied images are views into the buffer with the right bytes."""
+        jpegs = [make_jpeg(v) for v in self.values]
+        parser = parser_for(make_stream(jpegs), 7)
+        
+        views = []
+        for view in parser._iter_jpegs(copy=False):
+            self.assertIsInstance(view, memoryview)
+            views.append(bytes(view))
+        
+        self.assertEqual(views, jpegs)
+    
+    def test_parse_frames_max_frames(self):
+        """Test that parsing stops after max_frames frames."""
+        frames = list(parser_for(self.body, len(self.body)).parse_frames(max_frames=2))
+        self.assertEqual(len(frames), 2)
+    
+    def test_parse_frames_skips_leading_garbage(self):
+        """Test that bytes before the first JPEG, including a stray end marker, are skipped."""
+        body = b"\xff\xd9 partial frame tail" + self.body
+        frames = list(parser_for(body, 512).parse_frames())
+        self.assert_frames(frames)
+    
+    def test_parse_frames_keeps_large_frames(self):
+        """Test that frames larger than the old 100 KB trim limit stay intact."""
+        noise = np.random.default_rng(0).integers(0, 256, (400, 400, 3), dtype=np.uint8)
+        jpg = cv2.imencode('.jpg', noise)[1].tobytes()
+        self.assertGreater(len(jpg), 100000)
+        
+        frames = list(parser_for(make_stream([jpg]) + self.body, 4096).parse_frames())
+        
+        self.assertEqual(frames[0].shape, noise.shape)
+        self.assertEqual(len(frames), len(self.values) + 1)
+    
+    def test_parse_frames_resyncs_after_oversized_frame(self):
+        """Test that a start marker with no end marker does not grow the buffer forever."""
+        from OpenCV_APP.utils import mjpeg_parser
+        
+        body = b"\xff\xd8" + bytes(5000) + self.body
+        with patch.object(mjpeg_parser, 'MAX_FRAME_SIZE', 1024):
+            frames = list(parser_for(body, 512).parse_frames())
+        
+        self.assert_frames(frames)
+    
+    def test_parse_frames_background(self):
+        """Test that background reading delivers the latest frames."""
+        frames = list(parser_for(self.body, 7).parse_frames(background=True))
+        
+        # Stale frames may be dropped, but the stream's last frame is kept
+        self.assertGreaterEqual(len(frames), 1)
+        self.assertLessEqual(abs(int(frames[-1].mean()) - self.values[-1]), 2)
+    
+    def test_parse_frames_background_max_frames(self):
+        """Test that background reading stops after max_frames frames."""
+        frames = list(parser_for(self.body, 7).parse_frames(max_frames=1, background=True))
+        self.assertEqual(len(frames), 1)
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    """Serves the server's multipart body, chunked like ESP32-CAM firmware."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "multipart/x-mixed-replace;boundary=frame")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        body = self.server.body
+        for offset in range(0, len(body), 1000):
+            chunk = body[offset:offset + 1000]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+    
+    def log_message(self, *args):
+        pass
+
+
+class TestRawMJPEGStream(unittest.TestCase):
+    """Test cases for reading MJPEG over a plain HTTP connection."""
+    
+    def setUp(self):
+        """Serve a multipart stream on the loopback interface."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StreamHandler)
+        self.server.daemon_threads = True
+        self.server.body = b""
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/stream"
+    
+    def read_all(self, copy=True):
+        """Read every image the server sends."""
+        stream = RawMJPEGStream(self.url, timeout=2)
+        self.assertTrue(stream.connect())
+        try:
+            return [bytes(jpg) for jpg in stream._iter_jpegs(copy=copy)]
+        finally:
+            stream.disconnect()
+    
+    def test_images_split_by_content_length(self):
+        """Test that images are framed by length, even with an embedded end marker."""
+        # An end-of-image marker inside the data would cut a marker scan short
+        tricky = make_jpeg(40)[:-2] + b"\xff\xd9\x00" + make_jpeg(40)[-2:]
+        jpegs = [make_jpeg(10), tricky, make_jpeg(200)]
+        self.server.body = make_stream(jpegs)
+        
+        self.assertEqual(self.read_all(), jpegs)
+        self.assertEqual(self.read_all(copy=False), jpegs)
+    
+    def test_falls_back_to_markers_without_content_length(self):
+        """Test streams whose parts carry no length."""
+        jpegs = [make_jpeg(10), make_jpeg(200)]
+        self.server.body = b"".join(
+            b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpg + b"\r\n" for jpg in jpegs)
+        
+        self.assertEqual(self.read_all(), jpegs)
+    
+    def test_connect_failure(self):
+        """Test connecting to a port nothing listens on."""
+        self.server.server_close()
+        stream = RawMJPEGStream(self.url, timeout=1)
+        
+        self.assertFalse(stream.connect())
+        self.assertIsNone(stream._stream)
+
+
+class TestJpegCodec(unittest.TestCase):
+    """Test cases for JPEG encoding and decoding."""
+    
+    def test_decode_jpeg_opencv_fallback(self):
+        """Test decoding without TurboJPEG, including invalid data."""
+        from OpenCV_APP.utils import jpeg_codec
+        
+        with patch.object(jpeg_codec, '_get_turbo', return_value=None):
+            frame = jpeg_codec.decode_jpeg(bytearray(make_jpeg(120)))
+            self.assertEqual(frame.shape, (48, 64, 3))
+            self.assertIsNone(jpeg_codec.decode_jpeg(b"not a jpeg"))
+    
+    def test_decode_jpeg_prefers_turbojpeg(self):
+        """Test that TurboJPEG decodes frames when available."""
+        from OpenCV_APP.utils import jpeg_codec
+        
+        turbo = Mock()
+        turbo.decode.side_effect = [np.zeros((48, 64, 3), np.uint8), OSError("corrupt")]
+        with patch.object(jpeg_codec, '_get_turbo', return_value=turbo):
+            self.assertEqual(jpeg_codec.decode_jpeg(make_jpeg(10)).shape, (48, 64, 3))
+            self.assertIsNone(jpeg_codec.decode_jpeg(b"not a jpeg"))
+        
+        self.assertEqual(turbo.decode.call_count, 2)
+    
+    def test_decode_jpeg_turbojpeg_memoryview_not_copied(self):
+        """Test that TurboJPEG decodes a memoryview in place, without copying it."""
+        from OpenCV_APP.utils import jpeg_codec
+        
+        chunk = bytearray(b"--frame\r\n" + make_jpeg(10))
+        turbo = Mock()
+        turbo.decode.return_value = np.zeros((48, 64, 3), np.uint8)
+        with patch.object(jpeg_codec, '_get_turbo', return_value=turbo):
+            jpeg_codec.decode_jpeg(memoryview(chunk)[9:])
+        
+        buffer = turbo.decode.call_args[0][0]
+        self.assertIsInstance(buffer, np.ndarray)
+        self.assertEqual(buffer.tobytes(), make_jpeg(10))
+        self.assertTrue(np.shares_memory(buffer, np.frombuffer(chunk, np.uint8)))
+    
+    def test_jpeg_size_read_from_headers(self):
+        """Test reading the image size without decoding."""
+        from OpenCV_APP.utils import jpeg_codec
+        
+        jpeg = make_jpeg(120)
+        with patch.object(jpeg_codec.cv2, 'imdecode') as mock_decode:
+            self.assertEqual(jpeg_codec.jpeg_size(memoryview(jpeg)), (64, 48))
+        mock_decode.assert_not_called()
+        self.assertIsNone(jpeg_codec.jpeg_size(b"not a jpeg at all"))
+    
+    def test_encode_jpeg_opencv_fallback(self):
+        """Test encoding without TurboJPEG round-trips through the decoder."""
+        from OpenCV_APP.utils import jpeg_codec
+        
+        frame = np.full((48, 64, 3), 120, dtype=np.uint8)
+        with patch.object(jpeg_codec, '_get_turbo', return_value=None):
+            jpeg = jpeg_codec.encode_jpeg(frame, quality=90)
+            self.assertIsInstance(jpeg, bytes)
+            self.assertEqual(jpeg_codec.decode_jpeg(jpeg).shape, frame.shape)
+    
+    def test_encode_jpeg_prefers_turbojpeg(self):
+        """Test that TurboJPEG encodes frames when available."""
+        from OpenCV_APP.utils import jpeg_codec
+        
+        turbo = Mock()
+        turbo.encode.return_value = b"\xff\xd8jpeg\xff\xd9"
+        frame = np.zeros((48, 64, 3), np.uint8)
+        with patch.object(jpeg_codec, '_get_turbo', return_value=turbo):
+            self.assertEqual(jpeg_codec.encode_jpeg(frame, quality=70), b"\xff\xd8jpeg\xff\xd9")
+        
+        self.assertEqual(turbo.encode.call_args.kwargs['quality'], 70)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,23 +9,23 @@ from unittest.mock import Mock, patch, MagicMock
 import sys
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add repository root to path; the packages use package-relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from utils import (
+from OpenCV_APP.utils import (
     test_url_reachable,
     test_tcp_port,
     get_network_interfaces,
     test_stream_endpoint,
     format_connection_info
 )
-from core.diagnostics import CameraDiagnostics, NetworkDiagnostics
+from OpenCV_APP.core.diagnostics import CameraDiagnostics, NetworkDiagnostics
 
 
 class TestNetworkUtils(unittest.TestCase):
     """Test cases for network utility functions."""
     
-    @patch('requests.get')
+    @patch('OpenCV_APP.utils.network_utils.SESSION.get')
     def test_url_reachable_success(self, mock_get):
         """Test URL reachability check - success case."""
         mock_response = Mock()
@@ -35,7 +35,7 @@ class TestNetworkUtils(unittest.TestCase):
         result = test_url_reachable("http://example.com")
         self.assertTrue(result)
     
-    @patch('requests.get')
+    @patch('OpenCV_APP.utils.network_utils.SESSION.get')
     def test_url_reachable_failure(self, mock_get):
         """Test URL reachability check - failure case."""
         mock_response = Mock()
@@ -45,26 +45,158 @@ class TestNetworkUtils(unittest.TestCase):
         result = test_url_reachable("http://example.com")
         self.assertFalse(result)
     
-    @patch('socket.socket')
-    def test_tcp_port_open(self, mock_socket):
+    @patch('socket.create_connection')
+    def test_tcp_port_open(self, mock_create_connection):
         """Test TCP port check - port open."""
-        mock_sock = MagicMock()
-        mock_sock.connect_ex.return_value = 0
-        mock_socket.return_value = mock_sock
+        mock_create_connection.return_value = MagicMock()
         
         result = test_tcp_port("192.168.1.100", 80)
         self.assertTrue(result)
+        mock_create_connection.assert_called_once_with(("192.168.1.100", 80), timeout=3.0)
     
-    @patch('socket.socket')
-    def test_tcp_port_closed(self, mock_socket):
+    @patch('socket.create_connection')
+    def test_tcp_port_closed(self, mock_create_connection):
         """Test TCP port check - port closed."""
-        mock_sock = MagicMock()
-        mock_sock.connect_ex.return_value = 1
-        mock_socket.return_value = mock_sock
+        mock_create_connection.side_effect = ConnectionRefusedError()
         
         result = test_tcp_port("192.168.1.100", 80)
         self.assertFalse(result)
     
+    def test_scan_ports_batch(self):
+        """Test batched port scanning against a local listener."""
+        import socket
+        from OpenCV_APP.utils import scan_ports_batch
+        
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(8)
+        port = server.getsockname()[1]
+        
+        try:
+            hosts = ["127.0.0.2", "127.0.0.1", "127.0.0.3"]
+            open_hosts = scan_ports_batch(hosts, port, timeout=1, batch=2)
+        finally:
+            server.close()
+        
+        self.assertEqual(open_hosts, ["127.0.0.1"])
+    
+    def test_scan_subnet_select(self):
+        """Test scanning a whole subnet in one selector window."""
+        import socket
+        from OpenCV_APP.utils import scan_subnet_select
+        
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(8)
+        port = server.getsockname()[1]
+        
+        try:
+            open_hosts = scan_subnet_select("127.0.0", port, timeout=1)
+        finally:
+            server.close()
+        
+        self.assertEqual(open_hosts, ["127.0.0.1"])
+    
+    def test_subnet_scans_reject_invalid_subnet(self):
+        """Test that an invalid subnet fails before any probe is sent."""
+        from OpenCV_APP.utils import scan_subnet_select, discover_cameras_in_subnet
+        
+        with patch('OpenCV_APP.utils.network_utils.open_connections') as mock_open:
+            for scan in (scan_subnet_select, discover_cameras_in_subnet):
+                with self.assertRaises(ValueError):
+                    scan("192.168.300")
+            mock_open.assert_not_called()
+    
+    def test_discover_cameras_in_subnet(self):
+        """Test subnet discovery keeps hosts serving a root page, over one connection."""
+        import threading
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        from OpenCV_APP.utils import discover_cameras_in_subnet
+        
+        accepted = []
+        
+        class CountingServer(HTTPServer):
+            def verify_request(self, request, client_address):
+                accepted.append(client_address)
+                return True
+        
+        class Handler(BaseHTTPRequestHandler):
+            status = 200
+            
+            def do_GET(self):
+                self.send_response(self.status)
+                self.end_headers()
+            
+            def log_message(self, *args):
+                pass
+        
+        class NotFoundHandler(Handler):
+            status = 404
+        
+        camera = CountingServer(("127.0.0.1", 0), Handler)
+        port = camera.server_address[1]
+        servers = [camera]
+        try:
+            servers.append(CountingServer(("127.0.0.2", port), NotFoundHandler))
+        except OSError:
+            pass
+        for server in servers:
+            threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        
+        try:
+            cameras = discover_cameras_in_subnet("127.0.0", port, timeout=1, batch=64)
+        finally:
+            for server in servers:
+                server.shutdown()
+                server.server_close()
+        
+        self.assertEqual(cameras, ["127.0.0.1"])
+        self.assertEqual(len(accepted), len(servers))
+    
+    def test_network_helpers_do_not_import_opencv(self):
+        """Test that importing the network helpers does not load OpenCV."""
+        import subprocess
+        code = ("import sys; from OpenCV_APP.utils import test_tcp_port, discover_cameras_in_subnet; "
+                "sys.exit('cv2' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code],
+                                cwd=str(Path(__file__).parent.parent.parent))
+        self.assertEqual(result.returncode, 0)
+    
+    def test_session_uses_low_latency_adapter(self):
+        """Test that probe connections disable Nagle, keep alive and never retry."""
+        import socket
+        from OpenCV_APP.core.http import SESSION
+        from OpenCV_APP.utils import network_utils
+        
+        self.assertIs(network_utils.SESSION, SESSION)
+        adapter = SESSION.get_adapter("http://192.168.1.100/")
+        options = adapter.poolmanager.connection_pool_kw['socket_options']
+        
+        self.assertIn((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1), options)
+        self.assertIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1), options)
+        self.assertEqual(adapter.max_retries.total, 0)
+    
+    def test_dns_cache(self):
+        """Test that installed DNS caching reuses lookups until cleared."""
+        import socket
+        from OpenCV_APP.utils import install_dns_cache, uninstall_dns_cache, clear_dns_cache
+        
+        address = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.168.1.100', 80))]
+        with patch('socket.getaddrinfo', return_value=address) as mock_getaddrinfo:
+            install_dns_cache()
+            self.addCleanup(uninstall_dns_cache)
+            
+            self.assertEqual(socket.getaddrinfo("esp32cam.local", 80), address)
+            self.assertEqual(socket.getaddrinfo("esp32cam.local", 80), address)
+            self.assertEqual(mock_getaddrinfo.call_count, 1)
+            
+            clear_dns_cache()
+            socket.getaddrinfo("esp32cam.local", 80)
+            self.assertEqual(mock_getaddrinfo.call_count, 2)
+            
+            uninstall_dns_cache()
+            self.assertIs(socket.getaddrinfo, mock_getaddrinfo)
+    
     def test_format_connection_info(self):
         """Test connection info formatting."""
         info = format_connection_info("192.168.1.100", 80)
@@ -75,7 +207,16 @@ class TestNetworkUtils(unittest.TestCase):
         self.assertEqual(info['status_url'], "http://192.168.1.100:80/")
         self.assertEqual(info['web_interface'], "http://192.168.1.100:80")
     
-    @patch('requests.get')
+    def test_format_connection_info_cached_read_only(self):
+        """Test that repeated calls share one read-only result."""
+        info = format_connection_info("192.168.1.101", 81)
+        
+        self.assertIs(format_connection_info("192.168.1.101", 81), info)
+        with self.assertRaises(TypeError):
+            info['ip'] = "10.0.0.1"
+        self.assertEqual(dict(info)['stream_url'], "http://192.168.1.101:81/stream")
+    
+    @patch('OpenCV_APP.utils.network_utils.SESSION.get')
     def test_stream_endpoint_success(self, mock_get):
         """Test stream endpoint check - success."""
         mock_response = Mock()
@@ -125,7 +266,39 @@ class TestCameraDiagnostics(unittest.TestCase):
         result = CameraDiagnostics.ping_camera("192.168.1.100", 80)
         self.assertFalse(result)
     
-    @patch('requests.get')
+    def test_ping_many(self):
+        """Test probing several hosts at once against a local listener."""
+        import socket
+        
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(8)
+        port = server.getsockname()[1]
+        
+        try:
+            results = CameraDiagnostics.ping_many(["127.0.0.1", "127.0.0.2"], port, timeout=1)
+        finally:
+            server.close()
+        
+        self.assertEqual(results, {"127.0.0.1": True, "127.0.0.2": False})
+    
+    @patch('OpenCV_APP.core.diagnostics.SESSION.get')
+    @patch('OpenCV_APP.core.diagnostics.CameraDiagnostics.ping_camera', return_value=False)
+    def test_full_diagnostics_reuses_ping(self, mock_ping, mock_get):
+        """Test that repeated diagnostics of one camera ping it once."""
+        from OpenCV_APP.core.diagnostics import _ping_once
+        _ping_once.cache_clear()
+        self.addCleanup(_ping_once.cache_clear)
+        mock_get.return_value = Mock(status_code=200)
+        
+        with patch('OpenCV_APP.core.diagnostics.time.time', return_value=1000.0):
+            CameraDiagnostics.run_full_diagnostics("192.168.1.100", 80)
+            results = CameraDiagnostics.run_full_diagnostics("192.168.1.100", 80)
+        
+        self.assertFalse(results['ping_test'])
+        mock_ping.assert_called_once_with("192.168.1.100", 80)
+    
+    @patch('OpenCV_APP.core.diagnostics.SESSION.get')
     def test_check_http_status_success(self, mock_get):
         """Test HTTP status check - success."""
         mock_response = Mock()
@@ -139,7 +312,56 @@ class TestCameraDiagnostics(unittest.TestCase):
         self.assertIsNotNone(result['response_time'])
         self.assertIsNone(result['error'])
     
-    @patch('requests.get')
+    @patch('OpenCV_APP.core.diagnostics.CameraDiagnostics.get_camera_info', return_value={})
+    @patch('OpenCV_APP.core.diagnostics.CameraDiagnostics.check_http_status')
+    @patch('OpenCV_APP.core.diagnostics.CameraDiagnostics.cached_ping', return_value=False)
+    def test_full_diagnostics_checks_run_concurrently(self, mock_ping, mock_http, mock_info):
+        """Test that both HTTP checks of a camera are in flight together."""
+        import threading
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def check(url):
+            # Only returns if the other check is running at the same time
+            barrier.wait()
+            return {'url': url, 'reachable': False}
+        
+        mock_http.side_effect = check
+        
+        results = CameraDiagnostics.run_full_diagnostics("192.168.1.100")
+        
+        self.assertEqual(results['http_status']['url'], "http://192.168.1.100:80/")
+        self.assertEqual(results['stream_status']['url'], "http://192.168.1.100:80/stream")
+    
+    @patch('OpenCV_APP.core.diagnostics.CameraDiagnostics.get_camera_info')
+    @patch('OpenCV_APP.core.diagnostics.CameraDiagnostics.check_http_status')
+    @patch('OpenCV_APP.core.diagnostics.CameraDiagnostics.cached_ping', return_value=False)
+    def test_full_diagnostics_async(self, mock_ping, mock_http, mock_info):
+        """Test the async diagnostics pipeline for several cameras at once."""
+        import asyncio
+        mock_http.side_effect = lambda url: {'url': url, 'reachable': False}
+        mock_info.return_value = {'available': False}
+        
+        async def diagnose():
+            return await asyncio.gather(
+                CameraDiagnostics.run_full_diagnostics_async("192.168.1.100"),
+                CameraDiagnostics.run_full_diagnostics_async("192.168.1.101", 8080),
+            )
+        
+        first, second = asyncio.run(diagnose())
+        
+        self.assertEqual(first['http_status']['url'], "http://192.168.1.100:80/")
+        self.assertEqual(first['stream_status']['url'], "http://192.168.1.100:80/stream")
+        self.assertEqual(second['camera_port'], 8080)
+        self.assertEqual(second['stream_quality'], {'error': 'Skipped - camera not reachable'})
+        self.assertEqual(mock_http.call_count, 4)
+    
+    @patch('OpenCV_APP.core.diagnostics.SESSION.close')
+    def test_close_releases_pooled_connections(self, mock_close):
+        """Test that close() closes the shared HTTP session."""
+        CameraDiagnostics.close()
+        mock_close.assert_called_once()
+    
+    @patch('OpenCV_APP.core.diagnostics.SESSION.get')
     def test_check_http_status_timeout(self, mock_get):
         """Test HTTP status check - timeout."""
         import requests
@@ -164,7 +386,7 @@ class TestNetworkDiagnostics(unittest.TestCase):
         ip = NetworkDiagnostics.get_local_ip()
         self.assertEqual(ip, "192.168.1.50")
     
-    @patch('core.diagnostics.CameraDiagnostics.ping_camera')
+    @patch('OpenCV_APP.core.diagnostics.CameraDiagnostics.ping_camera')
     @patch('requests.get')
     def test_scan_subnet(self, mock_get, mock_ping):
         """Test subnet scanning."""
@@ -183,6 +405,55 @@ class TestNetworkDiagnostics(unittest.TestCase):
         # In a real test, we'd mock the entire range or limit it
         # For now, just verify the function exists and is callable
         self.assertTrue(callable(NetworkDiagnostics.scan_subnet))
+    
+    @patch('OpenCV_APP.core.diagnostics.NetworkDiagnostics.get_local_ip', return_value="10.0.0.5")
+    def test_scan_subnet_finds_listening_host(self, mock_local_ip):
+        """Test subnet scanning against a local listener."""
+        import socket
+        
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(8)
+        port = server.getsockname()[1]
+        
+        try:
+            devices = NetworkDiagnostics.scan_subnet("127.0.0", port=port, timeout=0.5)
+        finally:
+            server.close()
+        
+        self.assertEqual(devices, ["127.0.0.1"])
+    
+    @patch('socket.getaddrinfo')
+    def test_scan_subnet_rejects_hostnames(self, mock_getaddrinfo):
+        """Test that a non-numeric subnet is rejected without DNS lookups."""
+        with self.assertRaises(ValueError):
+            NetworkDiagnostics.scan_subnet("camera.local")
+        mock_getaddrinfo.assert_not_called()
+    
+    @patch('OpenCV_APP.core.diagnostics.NetworkDiagnostics.get_local_ip', return_value="10.0.0.5")
+    @patch('OpenCV_APP.core.diagnostics.CameraDiagnostics.ping_many')
+    def test_scan_subnet_inside_event_loop(self, mock_ping, mock_local_ip):
+        """Test that scanning works when called from a running event loop."""
+        import asyncio
+        mock_ping.side_effect = lambda ips, port, timeout: {
+            ip: ip in ["192.168.2.133", "192.168.2.88"] for ip in ips
+        }
+        
+        async def scan():
+            return NetworkDiagnostics.scan_subnet("192.168.2")
+        
+        self.assertEqual(asyncio.run(scan()), ["192.168.2.88", "192.168.2.133"])
+    
+    @patch('OpenCV_APP.core.diagnostics.NetworkDiagnostics.get_local_ip', return_value="192.168.2.50")
+    @patch('OpenCV_APP.core.diagnostics.CameraDiagnostics.ping_many')
+    def test_scan_subnet_skips_local_ip(self, mock_ping, mock_local_ip):
+        """Test that the scanning machine's own address is not probed."""
+        mock_ping.side_effect = lambda ips, port, timeout: {ip: True for ip in ips}
+        
+        devices = NetworkDiagnostics.scan_subnet("192.168.2")
+        
+        self.assertEqual(len(devices), 253)
+        self.assertNotIn("192.168.2.50", devices)
 
 
 if __name__ == '__main__':
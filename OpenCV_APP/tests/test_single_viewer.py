@@ -0,0 +1,104 @@
+"""
+Unit tests for the single camera viewer.
+
+Tests the background frame reader with mock cameras.
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import threading
+from pathlib import Path
+
+# Add repository root to path; the viewers use package-relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from OpenCV_APP.core import MockCamera, reset_config
+from OpenCV_APP.viewers import single_viewer
+
+
+class BlockingCamera(MockCamera):
+    """Mock camera whose reads block until released."""
+    
+    def __init__(self, name):
+        super().__init__(name, width=64, height=48)
+        self.reading = threading.Event()
+        self.unblock = threading.Event()
+        self.in_read = False
+        self.disconnected_during_read = False
+    
+    def read(self):
+        self.in_read = True
+        self.reading.set()
+        self.unblock.wait(5)
+        self.in_read = False
+        return super().read()
+    
+    def disconnect(self):
+        if self.in_read:
+            self.disconnected_during_read = True
+        super().disconnect()
+
+
+class TestFrameReader(unittest.TestCase):
+    """Test cases for reading frames off the UI thread."""
+    
+    def setUp(self):
+        """Create a viewer reading from a connected mock camera."""
+        reset_config()
+        self.addCleanup(reset_config)
+        with patch.object(single_viewer, 'FrameCapture'):
+            self.viewer = single_viewer.SingleCameraViewer("ESP32_CAM_1")
+        self.viewer.camera = MockCamera("ESP32_CAM_1", width=64, height=48)
+        self.viewer.camera.connect()
+    
+    def test_only_newest_frame_queued(self):
+        """Test that frames the UI has not consumed are replaced, not queued."""
+        reads = 0
+        read = self.viewer.camera.read
+        
+        def counting_read():
+            nonlocal reads
+            reads += 1
+            if reads == 5:
+                self.viewer.running = False
+            return read()
+        
+        self.viewer.running = True
+        with patch.object(self.viewer.camera, 'read', side_effect=counting_read):
+            reader = threading.Thread(target=self.viewer._read_frames)
+            reader.start()
+            reader.join(timeout=5)
+        
+        self.assertEqual(self.viewer._frames.qsize(), 1)
+        self.assertEqual(self.viewer._frames.get_nowait().shape, (48, 64, 3))
+    
+    
+    def test_stop_while_read_blocked(self):
+        """Test that the capture is not released while a read is still running."""
+        camera = BlockingCamera("ESP32_CAM_1")
+        camera.connect()
+        self.viewer.camera = camera
+        
+        def wait_key(delay):
+            camera.reading.wait(5)
+            return ord('q')
+        
+        with patch.object(single_viewer, 'cv2') as mock_cv2, \
+                patch.object(single_viewer, 'READER_JOIN_TIMEOUT', 0.05):
+            mock_cv2.waitKey.side_effect = wait_key
+            self.viewer.run()
+        
+        # The viewer has returned while the reader is still inside read()
+        self.assertTrue(camera.is_connected)
+        reader = next(t for t in threading.enumerate() if t.name == "read-ESP32_CAM_1")
+        
+        camera.unblock.set()
+        reader.join(timeout=5)
+        
+        self.assertFalse(camera.is_connected)
+        self.assertFalse(camera.disconnected_during_read)
+
+
+if __name__ == '__main__':
+    unittest.main()
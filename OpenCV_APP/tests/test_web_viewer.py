@@ -0,0 +1,401 @@
+"""
+Unit tests for the web viewer.
+
+Tests frame broadcasting and the Flask routes with mock cameras.
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add repository root to path; the viewers use package-relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from OpenCV_APP.core import ConnectionManager, MockCamera
+from OpenCV_APP.viewers import web_viewer
+
+
+class RecordingCamera(MockCamera):
+    """Mock camera that records which threads read it."""
+    
+    def __init__(self, name):
+        super().__init__(name, width=64, height=48)
+        self.reader_threads = set()
+        self.retrieved = 0
+    
+    def read(self):
+        self.reader_threads.add(threading.current_thread().name)
+        return super().read()
+    
+    def retrieve(self):
+        self.retrieved += 1
+        return super().retrieve()
+
+
+class TestFrameBroadcaster(unittest.TestCase):
+    """Test cases for the shared camera reader."""
+    
+    def setUp(self):
+        """Start a broadcaster on a connected mock camera."""
+        self.camera = RecordingCamera("Cam1")
+        self.camera.connect()
+        self.broadcaster = web_viewer.FrameBroadcaster(self.camera)
+        self.broadcaster.start()
+        self.addCleanup(self.broadcaster.stop)
+    
+    def test_wait_for_jpeg_returns_newer_frames(self):
+        """Test that each wait returns a frame newer than the last one."""
+        seq, jpeg = self.broadcaster.wait_for_jpeg(0)
+        self.assertIsNotNone(jpeg)
+        
+        next_seq, _ = self.broadcaster.wait_for_jpeg(seq)
+        self.assertGreater(next_seq, seq)
+    
+    def test_stop_wakes_waiting_clients(self):
+        """Test that stopping returns no frame to waiting clients."""
+        self.broadcaster.wait_for_jpeg(0)
+        self.broadcaster.stop()
+        seq, _ = self.broadcaster.latest_jpeg()
+        
+        self.assertEqual(self.broadcaster.wait_for_jpeg(seq, timeout=5), (seq, None))
+        self.assertFalse(self.broadcaster.running)
+    
+    def test_frames_above_target_fps_not_decoded(self):
+        """Test that frames arriving faster than target_fps are only grabbed."""
+        camera = RecordingCamera("Cam2")
+        camera.connect()
+        broadcaster = web_viewer.FrameBroadcaster(camera, target_fps=10)
+        
+        with patch.object(camera, 'grab', wraps=camera.grab) as mock_grab:
+            broadcaster.start()
+            time.sleep(0.25)
+            broadcaster.stop()
+        
+        self.assertGreater(camera.retrieved, 0)
+        self.assertLessEqual(camera.retrieved, 5)
+        self.assertGreater(mock_grab.call_count, camera.retrieved)
+
+
+class FakeParser:
+    """RawMJPEGStream stand-in that serves a fixed list of JPEG images."""
+    
+    jpegs = []
+    
+    def __init__(self, stream_url, timeout=5):
+        self.stream_url = stream_url
+    
+    def connect(self):
+        return True
+    
+    def iter_jpegs(self):
+        yield from self.jpegs
+    
+    def disconnect(self):
+        pass
+
+
+class TestPassthroughBroadcaster(unittest.TestCase):
+    """Test cases for forwarding camera JPEGs without re-encoding."""
+    
+    def test_forwards_camera_jpegs_unchanged(self):
+        """Test that clients receive the camera's bytes without a re-encode."""
+        image = np.full((48, 64, 3), 200, dtype=np.uint8)
+        jpeg = cv2.imencode('.jpg', image)[1].tobytes()
+        camera = MockCamera("Cam1")
+        
+        with patch.object(web_viewer, 'RawMJPEGStream', FakeParser), \
+                patch.object(FakeParser, 'jpegs', [jpeg]), \
+                patch.object(web_viewer, 'RECONNECT_DELAY', 0.01), \
+                patch.object(web_viewer, 'encode_jpeg') as mock_encode:
+            broadcaster = web_viewer.PassthroughBroadcaster(camera)
+            broadcaster.start()
+            self.addCleanup(broadcaster.stop)
+            
+            seq, forwarded = broadcaster.wait_for_jpeg(0)
+        
+        self.assertEqual(forwarded, jpeg)
+        mock_encode.assert_not_called()
+        self.assertFalse(camera.is_connected)
+    
+    def test_status_reports_open_passthrough_stream(self):
+        """Test that /status counts a camera as connected while its stream is forwarded."""
+        jpeg = cv2.imencode('.jpg', np.zeros((48, 64, 3), np.uint8))[1].tobytes()
+        camera = MockCamera("Cam1")
+        manager = ConnectionManager()
+        manager.add_camera(camera)
+        release = threading.Event()
+        
+        class HeldParser(FakeParser):
+            def iter_jpegs(self):
+                yield from self.jpegs
+                release.wait(5)
+        
+        with patch.object(web_viewer, 'RawMJPEGStream', HeldParser), \
+                patch.object(HeldParser, 'jpegs', [jpeg]), \
+                patch.object(web_viewer, 'connection_manager', manager):
+            broadcaster = web_viewer.PassthroughBroadcaster(camera)
+            broadcaster.start()
+            self.addCleanup(broadcaster.stop)
+            self.addCleanup(release.set)
+            broadcaster.wait_for_jpeg(0)
+            
+            with patch.dict(web_viewer.broadcasters, {"Cam1": broadcaster}, clear=True):
+                status = web_viewer.app.test_client().get('/status').get_json()
+        
+        self.assertEqual(status['connected_cameras'], ["Cam1"])
+        self.assertFalse(camera.is_connected)
+
+
+class TestInitializeCameras(unittest.TestCase):
+    """Test cases for setting up the web viewer's cameras."""
+    
+    def test_reinitializing_stops_previous_broadcasters(self):
+        """Test that a second initialization stops the readers of the first."""
+        with patch.object(web_viewer, 'RawMJPEGStream', FakeParser), \
+                patch.object(web_viewer, 'RECONNECT_DELAY', 0.01), \
+                patch.object(web_viewer, 'connection_manager', None), \
+                patch.object(web_viewer, '_page_stream_width', None), \
+                patch.dict(web_viewer.broadcasters, clear=True):
+            web_viewer.initialize_cameras(passthrough=True)
+            first = dict(web_viewer.broadcasters)
+            threads = [broadcaster._thread for broadcaster in first.values()]
+            web_viewer.initialize_cameras(passthrough=True)
+            second = dict(web_viewer.broadcasters)
+            web_viewer.shutdown_cameras()
+        
+        self.assertTrue(first)
+        self.assertEqual(set(first), set(second))
+        for name, broadcaster in first.items():
+            self.assertFalse(broadcaster.running)
+            self.assertIsNot(second[name], broadcaster)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+
+
+class TestWebRoutes(unittest.TestCase):
+    """Test cases for the Flask routes."""
+    
+    def setUp(self):
+        """Register a broadcasting mock camera with the web viewer."""
+        self.camera = RecordingCamera("ESP32_CAM_1")
+        manager = ConnectionManager(retry_attempts=1, retry_delay=0)
+        manager.add_camera(self.camera)
+        manager.connect_all()
+        
+        broadcaster = web_viewer.FrameBroadcaster(self.camera)
+        broadcaster.start()
+        patchers = [
+            patch.object(web_viewer, 'connection_manager', manager),
+            patch.dict(web_viewer.broadcasters, {"ESP32_CAM_1": broadcaster}, clear=True),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(broadcaster.stop)
+        self.broadcaster = broadcaster
+        self.client = web_viewer.app.test_client()
+    
+    def read_parts(self, count, clients=1):
+        """Read count multipart frames from each of several streaming clients."""
+        streams = [web_viewer.generate_frames("ESP32_CAM_1") for _ in range(clients)]
+        try:
+            return [[next(stream) for _ in range(count)] for stream in streams]
+        finally:
+            for stream in streams:
+                stream.close()
+    
+    def test_clients_share_one_reader(self):
+        """Test that several clients do not multiply camera reads."""
+        parts = self.read_parts(3, clients=3)
+        
+        for client_parts in parts:
+            for part in client_parts:
+                self.assertTrue(part.startswith(b'--frame\r\nContent-Type: image/jpeg'))
+        
+        # All camera reads come from the single broadcaster thread
+        self.assertEqual(self.camera.reader_threads, {"broadcast-ESP32_CAM_1"})
+    
+    def test_parts_carry_content_length(self):
+        """Test that each part announces the size of its JPEG."""
+        part = self.read_parts(1)[0][0]
+        
+        headers, body = part.split(b'\r\n\r\n', 1)
+        length = int(headers.split(b'Content-Length: ')[1])
+        self.assertEqual(len(body), length + 2)
+        self.assertTrue(body.startswith(b'\xff\xd8'))
+    
+    def test_clients_share_part_buffer(self):
+        """Test that a frame's multipart part is built once for all clients."""
+        self.broadcaster.stop()
+        self.broadcaster._publish(None, b'\xff\xd8jpeg\xff\xd9')
+        
+        first = self.broadcaster.wait_for_part(0)
+        second = self.broadcaster.wait_for_part(0)
+        
+        self.assertIs(first[1], second[1])
+        self.assertTrue(first[1].endswith(b'\xff\xd8jpeg\xff\xd9\r\n'))
+    
+    def test_parts_downscaled_when_published(self):
+        """Test that subscribed widths are scaled once, by the publisher."""
+        self.broadcaster.stop()
+        self.broadcaster.subscribe(64)
+        self.broadcaster.subscribe(256)
+        frame = np.zeros((96, 128, 3), dtype=np.uint8)
+        jpeg = cv2.imencode('.jpg', frame)[1].tobytes()
+        self.broadcaster._publish(frame, jpeg)
+        
+        with patch.object(web_viewer, 'encode_jpeg') as mock_encode:
+            _, small = self.broadcaster.wait_for_part(0, width=64)
+            _, full = self.broadcaster.wait_for_part(0, width=256)
+        
+        mock_encode.assert_not_called()
+        body = small.split(b'\r\n\r\n', 1)[1]
+        decoded = cv2.imdecode(np.frombuffer(body, np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(decoded.shape, (48, 64, 3))
+        self.assertIs(full, self.broadcaster.wait_for_part(0)[1])
+    
+    def test_passthrough_decoded_only_for_narrower_subscribers(self):
+        """Test that camera JPEGs are decoded only when a client needs them smaller."""
+        self.broadcaster.stop()
+        jpeg = cv2.imencode('.jpg', np.zeros((48, 64, 3), dtype=np.uint8))[1].tobytes()
+        
+        with patch.object(web_viewer, 'decode_jpeg', wraps=web_viewer.decode_jpeg) as mock_decode:
+            self.broadcaster._publish(None, jpeg)
+            self.broadcaster.subscribe(640)
+            self.broadcaster._publish(None, jpeg)
+            mock_decode.assert_not_called()
+            
+            self.broadcaster.subscribe(32)
+            self.broadcaster._publish(None, jpeg)
+            self.assertEqual(mock_decode.call_count, 1)
+            
+            self.broadcaster.unsubscribe(32)
+            self.broadcaster._publish(None, jpeg)
+            self.assertEqual(mock_decode.call_count, 1)
+        
+        _, part = self.broadcaster.wait_for_part(0, width=640)
+        self.assertTrue(part.endswith(jpeg + b'\r\n'))
+    
+    def test_stream_subscribes_while_open(self):
+        """Test that a client streaming at a width is registered until it leaves."""
+        stream = web_viewer.generate_frames("ESP32_CAM_1", width=32)
+        next(stream)
+        self.assertEqual(self.broadcaster._widths, {32: 1})
+        
+        stream.close()
+        self.assertEqual(self.broadcaster._widths, {})
+    
+    def test_slow_client_skips_to_newest_frame(self):
+        """Test that frames a client missed are dropped, not buffered."""
+        self.broadcaster.stop()
+        seq, _ = self.broadcaster.wait_for_part(0)
+        for jpeg in (b'\xff\xd8one\xff\xd9', b'\xff\xd8two\xff\xd9'):
+            self.broadcaster._publish(None, jpeg)
+        
+        next_seq, part = self.broadcaster.wait_for_part(seq)
+        
+        self.assertEqual(next_seq, seq + 2)
+        self.assertTrue(part.endswith(b'two\xff\xd9\r\n'))
+        self.assertEqual(self.broadcaster.wait_for_part(next_seq, timeout=0), (next_seq, None))
+    
+    def test_frames_encoded_once_for_all_clients(self):
+        """Test that JPEG encoding does not scale with the number of clients."""
+        with patch.object(web_viewer, 'encode_jpeg',
+                          wraps=web_viewer.encode_jpeg) as mock_encode:
+            first_seq = self.broadcaster.latest_jpeg()[0]
+            self.read_parts(3, clients=3)
+            self.broadcaster.stop()
+        
+        # One encode per published frame, plus one that may not have finished
+        published = self.broadcaster.latest_jpeg()[0] - first_seq
+        self.assertLessEqual(mock_encode.call_count, published + 1)
+    
+    def test_index_rendered_once(self):
+        """Test that the page template is not re-rendered per request."""
+        with patch.dict(web_viewer._index_pages, clear=True), \
+                patch.object(web_viewer, '_page_stream_width', 640), \
+                patch.object(web_viewer, 'render_template_string',
+                             wraps=web_viewer.render_template_string) as mock_render:
+            first = self.client.get('/')
+            second = self.client.get('/')
+        
+        self.assertEqual(first.data, second.data)
+        self.assertIn(b'/video_feed/ESP32_CAM_1?w=640', first.data)
+        self.assertEqual(first.mimetype, 'text/html')
+        mock_render.assert_called_once()
+    
+    def test_passthrough_index_requests_original_size(self):
+        """Test that the page does not make passthrough streams decode."""
+        with patch.dict(web_viewer._index_pages, clear=True), \
+                patch.object(web_viewer, '_page_stream_width', None):
+            page = self.client.get('/').data
+        
+        self.assertIn(b'/video_feed/ESP32_CAM_1"', page)
+    
+    def test_status_does_not_probe_broadcasting_cameras(self):
+        """Test that health comes from the broadcaster, not a camera read."""
+        self.broadcaster.wait_for_jpeg(0)
+        
+        with patch.object(web_viewer.connection_manager, 'health_check') as mock_health:
+            response = self.client.get('/status')
+        
+        self.assertEqual(response.get_json()['health_status'], {"ESP32_CAM_1": True})
+        mock_health.assert_not_called()
+        
+        self.broadcaster.stop()
+        self.assertFalse(self.broadcaster.is_healthy())
+    
+    def test_unknown_camera_stream_is_empty(self):
+        """Test that streaming an unknown camera yields nothing."""
+        self.assertEqual(list(web_viewer.generate_frames("missing")), [])
+    
+    def test_capture_saves_broadcast_jpeg(self):
+        """Test that capturing writes the broadcast JPEG without reading the camera."""
+        self.broadcaster.wait_for_jpeg(0)
+        
+        with patch.object(web_viewer, '_frame_capture') as mock_capture:
+            mock_capture.save_jpeg.return_value = "captures/frame.jpg"
+            response = self.client.post('/capture/ESP32_CAM_1')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['path'], "captures/frame.jpg")
+        self.assertEqual(self.camera.reader_threads, {"broadcast-ESP32_CAM_1"})
+        jpeg = mock_capture.save_jpeg.call_args.args[0]
+        self.assertTrue(jpeg.startswith(b'\xff\xd8'))
+        mock_capture.save_frame.assert_not_called()
+
+
+
+@patch.object(web_viewer.logging, 'basicConfig')
+@patch.object(web_viewer, 'shutdown_cameras')
+@patch.object(web_viewer, 'initialize_cameras')
+class TestMain(unittest.TestCase):
+    """Test cases for choosing the web server."""
+    
+    @patch.object(web_viewer, 'BaseApplication', None)
+    @patch.object(web_viewer.app, 'run')
+    def test_falls_back_to_flask_without_gunicorn(self, mock_run, mock_init, mock_shutdown, _):
+        """Test that Flask's threaded server runs when gunicorn is missing."""
+        web_viewer.main(port=5001)
+        
+        mock_init.assert_called_once_with(passthrough=True)
+        self.assertTrue(mock_run.call_args.kwargs['threaded'])
+        mock_shutdown.assert_called_once()
+    
+    @patch.object(web_viewer, 'BaseApplication', object)
+    @patch.object(web_viewer, 'run_gunicorn')
+    def test_uses_gunicorn_when_installed(self, mock_gunicorn, mock_init, mock_shutdown, _):
+        """Test that gunicorn workers open the cameras themselves."""
+        web_viewer.main(port=5001, workers=2)
+        
+        mock_gunicorn.assert_called_once_with('0.0.0.0', 5001, 2, True)
+        mock_init.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,26 +5,57 @@ This package contains utility functions for frame capture,
 network operations, and MJPEG stream parsing.
 """
 
-from .frame_capture import FrameCapture
-from .network_utils import (
-    test_url_reachable,
-    test_tcp_port,
-    discover_cameras_in_subnet,
-    get_network_interfaces,
-    test_stream_endpoint,
-    format_connection_info
-)
-from .mjpeg_parser import MJPEGParser, extract_frame_from_stream, test_mjpeg_stream
+import importlib
+
+# Names are imported from their submodule on first access (PEP 562), so
+# callers that only need the network helpers do not import OpenCV.
+_LAZY_ATTRIBUTES = {
+    'FrameCapture': 'frame_capture',
+    'test_url_reachable': 'network_utils',
+    'test_tcp_port': 'network_utils',
+    'scan_ports_batch': 'network_utils',
+    'scan_subnet_select': 'network_utils',
+    'discover_cameras_in_subnet': 'network_utils',
+    'get_network_interfaces': 'network_utils',
+    'test_stream_endpoint': 'network_utils',
+    'format_connection_info': 'network_utils',
+    'install_dns_cache': 'network_utils',
+    'uninstall_dns_cache': 'network_utils',
+    'clear_dns_cache': 'network_utils',
+    'MJPEGParser': 'mjpeg_parser',
+    'RawMJPEGStream': 'mjpeg_parser',
+    'extract_frame_from_stream': 'mjpeg_parser',
+    'test_mjpeg_stream': 'mjpeg_parser',
+}
 
 __all__ = [
     'FrameCapture',
     'test_url_reachable',
     'test_tcp_port',
+    'scan_ports_batch',
+    'scan_subnet_select',
     'discover_cameras_in_subnet',
     'get_network_interfaces',
     'test_stream_endpoint',
     'format_connection_info',
+    'install_dns_cache',
+    'uninstall_dns_cache',
+    'clear_dns_cache',
     'MJPEGParser',
+    'RawMJPEGStream',
     'extract_frame_from_stream',
     'test_mjpeg_stream',
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -8,29 +8,168 @@ with various formats and naming conventions.
 import cv2
 import numpy as np
 import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Callable, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# JPEG quality used by the default writer (OpenCV's own default is 95)
+DEFAULT_JPEG_QUALITY = 85
+
+_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
 
 class FrameCapture:
     """Utility class for capturing and saving frames."""
     
-    def __init__(self, output_dir: str = "captures"):
+    def __init__(self, output_dir: str = "captures",
+                 writer: Optional[Callable[[str, np.ndarray], bool]] = None,
+                 async_writes: bool = False,
+                 jpeg_quality: int = DEFAULT_JPEG_QUALITY):
         """
         Initialize frame capture utility.
         
         Args:
             output_dir: Directory to save captured frames
+            writer: Function called as writer(path, frame) to store each image.
+                Defaults to encoding with cv2.imencode and writing the bytes
+                directly; the output directory is only created for the
+                default writer.
+            async_writes: Queue writes on a background pool and return the
+                target path immediately. Call flush() before exiting.
+            jpeg_quality: JPEG quality (0-100) used by the default writer
         """
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Joined once so each save only concatenates the file name
+        self._output_prefix = os.path.join(str(self.output_dir), "")
+        self._encode_params = [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]
+        self._dir_fd: Optional[int] = None
+        self.writer = writer or self._write_jpeg
+        if writer is None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            if os.open in os.supports_dir_fd and hasattr(os, 'O_DIRECTORY'):
+                self._dir_fd = os.open(self._output_prefix, os.O_RDONLY | os.O_DIRECTORY)
+        self.async_writes = async_writes
+        # Runs every background write: queued async writes, and the two frames
+        # of a pair, which encode in parallel since OpenCV releases the GIL.
+        # Its threads are only started by the first write.
+        self._io_pool = ThreadPoolExecutor(max_workers=2,
+                                           thread_name_prefix="frame-capture-io")
+        self._pending: List[Future] = []
         logger.info(f"Frame capture initialized with output dir: {self.output_dir}")
     
+    def __del__(self):
+        """Release the output directory handle."""
+        self.close()
+    
+    def close(self):
+        """Wait for queued writes, stop the write pool and release the directory handle."""
+        if getattr(self, '_pending', None):
+            self.flush()
+        io_pool, self._io_pool = getattr(self, '_io_pool', None), None
+        if io_pool is not None:
+            # Queued writes were flushed above; not waiting also keeps a
+            # close() from __del__ on a writer thread from joining itself
+            io_pool.shutdown(wait=False)
+        dir_fd, self._dir_fd = getattr(self, '_dir_fd', None), None
+        if dir_fd is not None:
+            os.close(dir_fd)
+    
+    def _write_jpeg(self, filepath: str, frame: np.ndarray) -> bool:
+        """
+        Encode a frame as JPEG and write the bytes to filepath.
+        
+        Args:
+            filepath: Destination path
+            frame: Frame to encode
+        
+        Returns:
+            True if the file was written
+        """
+        ok, buffer = cv2.imencode('.jpg', frame, self._encode_params)
+        if not ok:
+            return False
+        self._write_bytes(filepath, buffer)
+        return True
+    
+    def _write_bytes(self, filepath: str, data):
+        """
+        Write encoded image data to filepath.
+        
+        Files inside the output directory are opened relative to its cached
+        directory handle, so the path is not resolved again on every save.
+        
+        Args:
+            filepath: Destination path
+            data: Encoded image (any object supporting the buffer protocol)
+        """
+        if self._dir_fd is not None and filepath.startswith(self._output_prefix):
+            fd = os.open(filepath[len(self._output_prefix):], _OPEN_FLAGS, 0o644,
+                         dir_fd=self._dir_fd)
+        else:
+            fd = os.open(filepath, _OPEN_FLAGS, 0o644)
+        
+        try:
+            data = memoryview(data).cast('B')
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+    
+    def _write(self, filepath: str, frame: np.ndarray) -> bool:
+        """Write one frame, logging instead of raising on failure."""
+        try:
+            if self.writer(filepath, frame) is False:
+                logger.error(f"Writer could not save {filepath}")
+                return False
+            return True
+        except Exception as e:
+            logger.error(f"Error saving frame to {filepath}: {e}")
+            return False
+    
+    def _submit(self, filepath: str, frame: np.ndarray) -> str:
+        """Queue a write on the background pool and return its path."""
+        # Copy so the caller can reuse its capture buffer straight away
+        self._pending = [f for f in self._pending if not f.done()]
+        self._pending.append(self._io_pool.submit(self._write, filepath, frame.copy()))
+        return filepath
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for queued background writes to finish.
+        
+        Args:
+            timeout: Maximum seconds to wait for all writes (None waits forever)
+        
+        Returns:
+            True if every queued write succeeded
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return True
+        
+        done, not_done = wait(pending, timeout=timeout)
+        if not_done:
+            logger.warning(f"{len(not_done)} frame writes still pending after flush")
+            self._pending.extend(not_done)
+        return not not_done and all(f.result() for f in done)
+    
+    @staticmethod
+    def _timestamp(now: Optional[datetime] = None) -> str:
+        """Format a capture time for file names (millisecond resolution)."""
+        return (now or datetime.now()).strftime("%Y%m%d_%H%M%S_%f")[:-3]
+    
+    def _build_filename(self, camera_name: str, timestamp: str,
+                        prefix: str = "", suffix: str = "") -> str:
+        """Build the output path of a capture."""
+        return f"{self._output_prefix}{prefix}{camera_name}_{timestamp}{suffix}.jpg"
+    
     def save_frame(self, frame: np.ndarray, camera_name: str = "camera", 
-                   prefix: str = "", suffix: str = "") -> Optional[str]:
+                   prefix: str = "", suffix: str = "",
+                   timestamp: Optional[str] = None) -> Optional[str]:
         """
         Save a single frame to disk.
         
@@ -39,6 +178,8 @@ class FrameCapture:
             camera_name: Name of the camera
             prefix: Optional prefix for filename
             suffix: Optional suffix for filename
+            timestamp: Timestamp for the filename; the current time is used
+                if not given
             
         Returns:
             Path to saved file or None if failed
@@ -48,23 +189,80 @@ class FrameCapture:
             return None
         
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
-            filename = f"{prefix}{camera_name}_{timestamp}{suffix}.jpg"
-            filepath = self.output_dir / filename
+            filepath = self._build_filename(camera_name, timestamp or self._timestamp(),
+                                            prefix, suffix)
+            
+            if self.async_writes:
+                logger.info(f"Queued frame for {filepath}")
+                return self._submit(filepath, frame)
             
-            cv2.imwrite(str(filepath), frame)
+            self.writer(filepath, frame)
             logger.info(f"Saved frame to {filepath}")
-            return str(filepath)
+            return filepath
             
         except Exception as e:
             logger.error(f"Error saving frame: {e}")
             return None
     
+    def _write_encoded(self, filepath: str, jpeg: bytes) -> bool:
+        """Write an encoded image, logging instead of raising on failure."""
+        try:
+            if self._dir_fd is None:
+                # A custom writer does not create the output directory
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._write_bytes(filepath, jpeg)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving JPEG to {filepath}: {e}")
+            return False
+    
+    def save_jpeg(self, jpeg: bytes, camera_name: str = "camera",
+                  prefix: str = "", suffix: str = "",
+                  timestamp: Optional[str] = None) -> Optional[str]:
+        """
+        Save an already encoded JPEG image to disk as is.
+        
+        The bytes are written without decoding or re-encoding, bypassing the
+        writer.
+        
+        Args:
+            jpeg: Encoded JPEG image
+            camera_name: Name of the camera
+            prefix: Optional prefix for filename
+            suffix: Optional suffix for filename
+            timestamp: Timestamp for the filename; the current time is used
+                if not given
+            
+        Returns:
+            Path to saved file or None if failed
+        """
+        if not jpeg:
+            logger.error("Cannot save empty JPEG")
+            return None
+        
+        filepath = self._build_filename(camera_name, timestamp or self._timestamp(),
+                                        prefix, suffix)
+        
+        if self.async_writes:
+            # Bytes are immutable, so unlike frames they are queued uncopied
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(self._io_pool.submit(self._write_encoded, filepath, jpeg))
+            logger.info(f"Queued JPEG for {filepath}")
+            return filepath
+        
+        if not self._write_encoded(filepath, jpeg):
+            return None
+        logger.info(f"Saved JPEG to {filepath}")
+        return filepath
+    
     def save_frame_pair(self, frame1: np.ndarray, frame2: np.ndarray,
                        name1: str = "cam1", name2: str = "cam2") -> tuple:
         """
         Save a pair of frames with synchronized timestamps.
         
+        Both frames are encoded and written concurrently. With async_writes
+        the paths are returned as soon as the writes are queued.
+        
         Args:
             frame1: First frame
             frame2: Second frame
@@ -74,23 +272,36 @@ class FrameCapture:
         Returns:
             Tuple of (path1, path2)
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        timestamp = self._timestamp()
         
         path1 = None
         path2 = None
         
+        if self.async_writes:
+            if frame1 is not None:
+                path1 = self._submit(self._build_filename(name1, timestamp), frame1)
+            if frame2 is not None:
+                path2 = self._submit(self._build_filename(name2, timestamp), frame2)
+            logger.info(f"Queued frame pair: {path1}, {path2}")
+            return path1, path2
+        
         try:
+            write1 = write2 = None
             if frame1 is not None:
-                filename1 = f"{name1}_{timestamp}.jpg"
-                filepath1 = self.output_dir / filename1
-                cv2.imwrite(str(filepath1), frame1)
-                path1 = str(filepath1)
+                filepath1 = self._build_filename(name1, timestamp)
+                write1 = self._io_pool.submit(self.writer, filepath1, frame1)
             
             if frame2 is not None:
-                filename2 = f"{name2}_{timestamp}.jpg"
-                filepath2 = self.output_dir / filename2
-                cv2.imwrite(str(filepath2), frame2)
-                path2 = str(filepath2)
+                filepath2 = self._build_filename(name2, timestamp)
+                write2 = self._io_pool.submit(self.writer, filepath2, frame2)
+            
+            if write1 is not None:
+                write1.result()
+                path1 = filepath1
+            
+            if write2 is not None:
+                write2.result()
+                path2 = filepath2
             
             logger.info(f"Saved frame pair: {path1}, {path2}")
             
@@ -100,7 +311,8 @@ class FrameCapture:
         return path1, path2
     
     def save_annotated_frame(self, frame: np.ndarray, camera_name: str,
-                            text: Optional[str] = None) -> Optional[str]:
+                            text: Optional[str] = None,
+                            modify_in_place: bool = False) -> Optional[str]:
         """
         Save frame with text annotation.
         
@@ -108,6 +320,9 @@ class FrameCapture:
             frame: Frame to save
             camera_name: Camera name
             text: Optional text to overlay on frame
+            modify_in_place: Draw the annotation on the given frame instead of
+                a copy. Saves a full-frame copy when the caller no longer
+                needs the original.
             
         Returns:
             Path to saved file or None if failed
@@ -115,11 +330,12 @@ class FrameCapture:
         if frame is None:
             return None
         
-        # Create a copy to avoid modifying original
-        annotated_frame = frame.copy()
+        # Create a copy to avoid modifying original, unless the caller allows it
+        annotated_frame = frame if modify_in_place else frame.copy()
         
         # Add timestamp
-        timestamp_text = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = datetime.now()
+        timestamp_text = now.strftime("%Y-%m-%d %H:%M:%S")
         cv2.putText(annotated_frame, timestamp_text, (10, 30),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
@@ -132,7 +348,8 @@ class FrameCapture:
             cv2.putText(annotated_frame, text, (10, 90),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
-        return self.save_frame(annotated_frame, camera_name, prefix="annotated_")
+        return self.save_frame(annotated_frame, camera_name, prefix="annotated_",
+                               timestamp=self._timestamp(now))
     
     def create_video_writer(self, filename: str, fps: int = 20,
                            frame_size: tuple = (640, 480)) -> cv2.VideoWriter:
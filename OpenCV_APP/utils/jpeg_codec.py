@@ -0,0 +1,110 @@
+"""
+JPEG encoding and decoding for ESP32-CAM frames.
+
+Frames are coded with libjpeg-turbo through PyTurboJPEG when it is
+installed, which is several times faster than OpenCV's bundled codec,
+and with cv2.imencode/cv2.imdecode otherwise.
+"""
+
+import cv2
+import numpy as np
+import logging
+import threading
+from typing import Optional, Tuple
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+except ImportError:  # optional dependency, fall back to OpenCV
+    TurboJPEG = TJPF_BGR = None
+
+logger = logging.getLogger(__name__)
+
+_turbo = None
+_turbo_checked = False
+_turbo_lock = threading.Lock()
+
+
+def _get_turbo():
+    """Return the shared TurboJPEG codec, or None if it is unavailable."""
+    global _turbo, _turbo_checked
+    if not _turbo_checked:
+        with _turbo_lock:
+            if not _turbo_checked:
+                if TurboJPEG is not None:
+                    try:
+                        _turbo = TurboJPEG()
+                    except Exception as e:
+                        # The Python package is installed but libturbojpeg is not
+                        logger.warning(f"TurboJPEG unavailable, using OpenCV: {e}")
+                _turbo_checked = True
+    return _turbo
+
+
+# Start-of-frame markers, which carry the image size; C4, C8 and CC are not
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_size(data) -> Optional[Tuple[int, int]]:
+    """
+    Read the size of a JPEG image from its headers without decoding it.
+    
+    Args:
+        data: Encoded JPEG (bytes, bytearray or memoryview)
+    
+    Returns:
+        Tuple of (width, height), or None if no frame header was found
+    """
+    pos = 2
+    end = len(data) - 9
+    while pos < end:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker in _SOF_MARKERS:
+            height = (data[pos + 5] << 8) | data[pos + 6]
+            width = (data[pos + 7] << 8) | data[pos + 8]
+            return width, height
+        pos += 2 + ((data[pos + 2] << 8) | data[pos + 3])
+    return None
+
+
+def decode_jpeg(data) -> Optional[np.ndarray]:
+    """
+    Decode a JPEG image to a BGR frame.
+    
+    Args:
+        data: Encoded JPEG (bytes, bytearray or memoryview)
+    
+    Returns:
+        Decoded frame, or None if the data could not be decoded
+    """
+    # A view of the caller's buffer; neither decoder needs its own copy
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    turbo = _get_turbo()
+    if turbo is not None:
+        try:
+            return turbo.decode(buffer, pixel_format=TJPF_BGR)
+        except Exception:
+            return None
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = 80) -> Optional[bytes]:
+    """
+    Encode a BGR frame as JPEG.
+    
+    Args:
+        frame: Frame to encode
+        quality: JPEG quality (0-100)
+    
+    Returns:
+        Encoded JPEG, or None if the frame could not be encoded
+    """
+    turbo = _get_turbo()
+    if turbo is not None:
+        try:
+            return turbo.encode(frame, quality=quality, pixel_format=TJPF_BGR)
+        except Exception:
+            return None
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes() if ok else None
@@ -5,14 +5,40 @@ This module provides utilities for parsing and handling MJPEG streams
 from ESP32-CAM devices.
 """
 
-import cv2
+import http.client
 import numpy as np
 import requests
 import logging
+import queue
+import socket
+import threading
 from typing import Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+from .jpeg_codec import decode_jpeg
 
 logger = logging.getLogger(__name__)
 
+# JPEG start-of-image and end-of-image markers
+_SOI = b'\xff\xd8'
+_EOI = b'\xff\xd9'
+
+# Maximum bytes taken from the socket per read
+READ_SIZE = 65536
+
+# Largest encoded frame accepted before the buffer is resynchronised
+MAX_FRAME_SIZE = 4 * 1024 * 1024
+
+# Encoded frames waiting for decode when reading in the background
+DECODE_QUEUE_SIZE = 2
+
+# Kernel receive buffer for raw stream sockets; a small buffer keeps stale
+# frames from queueing up in the kernel when the reader falls behind
+RAW_RCVBUF = 65536
+
+# Longest multipart boundary or part header line accepted
+MAX_HEADER_LINE = 1024
+
 
 class MJPEGParser:
     """Parser for MJPEG streams."""
@@ -66,12 +92,153 @@ class MJPEGParser:
             self._session = None
         logger.info("Disconnected from MJPEG stream")
     
-    def parse_frames(self, max_frames: Optional[int] = None) -> Iterator[np.ndarray]:
+    def _reader(self):
+        """Return the file-like object the stream body is read from."""
+        # Read straight from the urllib3 response rather than through requests
+        return self._stream.raw
+    
+    def _iter_jpegs(self, copy: bool = True) -> Iterator[bytes]:
+        """
+        Extract JPEG images from the stream without decoding them.
+        
+        Args:
+            copy: Yield each image as its own bytes object. If False, a
+                memoryview into the receive buffer is yielded instead; it is
+                released when the generator resumes, so it must be consumed
+                before asking for the next image.
+        
+        Yields:
+            Encoded JPEG images
+        """
+        buffer = bytearray()
+        start = -1         # Offset of the current frame's JPEG start marker
+        search_from = 0    # Offset to resume looking for its end marker
+        
+        # read1 returns whatever has arrived (up to READ_SIZE) instead of
+        # waiting for a full block
+        raw = self._reader()
+        read = getattr(raw, 'read1', None) or raw.read
+        
+        while True:
+            chunk = read(READ_SIZE)
+            if not chunk:
+                break
+            buffer.extend(chunk)
+            
+            # Extract every complete JPEG in the buffer. Only bytes not
+            # searched before are scanned, so parsing stays linear.
+            while True:
+                if start == -1:
+                    start = buffer.find(_SOI)
+                    if start == -1:
+                        # Keep a last byte that may begin a split marker
+                        del buffer[:-1]
+                        break
+                    search_from = start + 2
+                
+                end = buffer.find(_EOI, search_from)
+                if end == -1:
+                    search_from = max(start + 2, len(buffer) - 1)
+                    break
+                
+                # Extract JPEG image
+                with memoryview(buffer) as view, view[start:end + 2] as jpg_view:
+                    if copy:
+                        jpg = bytes(jpg_view)
+                    else:
+                        # The buffer cannot be resized while the view is
+                        # exported, so it is released before trimming
+                        yield jpg_view
+                del buffer[:end + 2]
+                start = -1
+                if copy:
+                    yield jpg
+            
+            # A start marker without an end marker within MAX_FRAME_SIZE is
+            # not a real frame; drop it and resynchronise on the next marker.
+            # Frames below the limit are never cut, however large.
+            if start != -1 and len(buffer) - start > MAX_FRAME_SIZE:
+                logger.warning("Dropping oversized or corrupt MJPEG frame")
+                del buffer[:-1]
+                start = -1
+    
+    def _iter_jpegs_in_background(self) -> Iterator[bytes]:
+        """
+        Extract JPEG images on a reader thread, keeping only the newest ones.
+        
+        The reader keeps receiving while the caller decodes. When the caller
+        falls behind, the oldest waiting images are dropped so that it always
+        gets recent frames.
+        
+        Yields:
+            Encoded JPEG images
+        """
+        jpegs: queue.Queue = queue.Queue(maxsize=DECODE_QUEUE_SIZE)
+        stopped = threading.Event()
+        
+        def put_latest(item):
+            while True:
+                try:
+                    jpegs.put_nowait(item)
+                    return
+                except queue.Full:
+                    # Drop the stalest image to make room
+                    try:
+                        jpegs.get_nowait()
+                    except queue.Empty:
+                        pass
+        
+        def read_stream():
+            try:
+                for jpg in self._iter_jpegs():
+                    if stopped.is_set():
+                        break
+                    put_latest(jpg)
+            except Exception as e:
+                if not stopped.is_set():
+                    logger.error(f"Error reading stream: {e}")
+            finally:
+                put_latest(None)
+        
+        reader = threading.Thread(target=read_stream, name="mjpeg-reader", daemon=True)
+        reader.start()
+        try:
+            while True:
+                jpg = jpegs.get()
+                if jpg is None:
+                    break
+                yield jpg
+        finally:
+            # The reader exits after its next read, or when the stream closes
+            stopped.set()
+    
+    def iter_jpegs(self) -> Iterator[bytes]:
+        """
+        Iterate over the stream's JPEG images without decoding them.
+        
+        Yields:
+            Encoded JPEG images, exactly as sent by the camera
+        """
+        if not self._stream:
+            logger.error("Not connected to stream")
+            return
+        
+        jpegs = self._iter_jpegs()
+        try:
+            yield from jpegs
+        finally:
+            jpegs.close()
+    
+    def parse_frames(self, max_frames: Optional[int] = None,
+                     background: bool = False) -> Iterator[np.ndarray]:
         """
         Parse frames from the MJPEG stream.
         
         Args:
             max_frames: Maximum number of frames to parse (None for unlimited)
+            background: Receive the stream on a separate thread while frames
+                are decoded. Frames the caller is too slow for are skipped,
+                so latency stays low but not every frame is returned.
             
         Yields:
             Numpy arrays representing frames
@@ -81,38 +248,27 @@ class MJPEGParser:
             return
         
         frame_count = 0
-        byte_buffer = b''
+        # Decoding reads the image before the next one is requested, so the
+        # foreground path decodes straight from the receive buffer
+        jpegs = (self._iter_jpegs_in_background() if background
+                 else self._iter_jpegs(copy=False))
         
         try:
-            for chunk in self._stream.iter_content(chunk_size=1024):
-                byte_buffer += chunk
-                
-                # Look for JPEG markers
-                start = byte_buffer.find(b'\xff\xd8')  # JPEG start
-                end = byte_buffer.find(b'\xff\xd9')    # JPEG end
+            for jpg in jpegs:
+                # Decode JPEG
+                frame = decode_jpeg(jpg)
                 
-                if start != -1 and end != -1 and end > start:
-                    # Extract JPEG image
-                    jpg = byte_buffer[start:end + 2]
-                    byte_buffer = byte_buffer[end + 2:]
-                    
-                    # Decode JPEG
-                    frame = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR)
-                    
-                    if frame is not None:
-                        frame_count += 1
-                        yield frame
-                        
-                        if max_frames and frame_count >= max_frames:
-                            break
+                if frame is not None:
+                    frame_count += 1
+                    yield frame
                 
-                # Prevent buffer from growing too large
-                if len(byte_buffer) > 100000:
-                    byte_buffer = byte_buffer[-10000:]
+                    if max_frames and frame_count >= max_frames:
+                        break
                     
         except Exception as e:
             logger.error(f"Error parsing frames: {e}")
         finally:
+            jpegs.close()
             logger.info(f"Parsed {frame_count} frames")
     
     def get_single_frame(self) -> Optional[np.ndarray]:
@@ -144,6 +300,132 @@ class MJPEGParser:
         self.disconnect()
 
 
+class RawMJPEGStream(MJPEGParser):
+    """
+    MJPEG stream reader working on a plain HTTP connection.
+    
+    Skips the requests and urllib3 layers and splits images by the
+    Content-Length header ESP32-CAM sends with every part, so image bytes
+    are never scanned for markers. Streams whose parts carry no length
+    fall back to the marker scan of MJPEGParser.
+    """
+    
+    def __init__(self, stream_url: str, timeout: int = 5, rcvbuf: int = RAW_RCVBUF):
+        """
+        Initialize the stream reader.
+        
+        Args:
+            stream_url: URL of the MJPEG stream
+            timeout: Connection and read timeout in seconds
+            rcvbuf: Socket receive buffer size in bytes
+        """
+        super().__init__(stream_url, timeout)
+        self.rcvbuf = rcvbuf
+        self._connection: Optional[http.client.HTTPConnection] = None
+    
+    def connect(self) -> bool:
+        """
+        Connect to the MJPEG stream.
+        
+        Returns:
+            True if connection successful, False otherwise
+        """
+        url = urlparse(self.stream_url)
+        path = url.path or '/'
+        if url.query:
+            path += '?' + url.query
+        
+        try:
+            self._connection = http.client.HTTPConnection(url.hostname, url.port or 80,
+                                                          timeout=self.timeout)
+            self._connection.connect()
+            self._connection.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+            self._connection.request('GET', path)
+            self._stream = self._connection.getresponse()
+            
+            if self._stream.status == 200:
+                logger.info(f"Connected to MJPEG stream: {self.stream_url}")
+                return True
+            logger.error(f"Failed to connect: HTTP {self._stream.status}")
+        except Exception as e:
+            logger.error(f"Error connecting to stream: {e}")
+        
+        self.disconnect()
+        return False
+    
+    def disconnect(self):
+        """Disconnect from the stream."""
+        if self._stream:
+            self._stream.close()
+            self._stream = None
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+        logger.info("Disconnected from MJPEG stream")
+    
+    def _reader(self):
+        """Return the file-like object the stream body is read from."""
+        # http.client decodes chunked transfer encoding, which ESP32-CAM uses
+        return self._stream
+    
+    def _iter_jpegs(self, copy: bool = True) -> Iterator[bytes]:
+        """
+        Extract JPEG images from the stream by their Content-Length.
+        
+        Args:
+            copy: Yield each image as its own bytes object. If False, a
+                memoryview into a reused buffer is yielded instead; it is
+                overwritten by the next image, so it must be consumed
+                before asking for the next one.
+        
+        Yields:
+            Encoded JPEG images
+        """
+        response = self._stream
+        buffer = bytearray()
+        
+        while True:
+            # Skip to the next boundary line, then read the part headers
+            line = response.readline(MAX_HEADER_LINE)
+            if not line:
+                return
+            if not line.startswith(b'--'):
+                continue
+            
+            length = None
+            while True:
+                header = response.readline(MAX_HEADER_LINE)
+                if not header:
+                    return
+                if not header.strip():
+                    break
+                name, _, value = header.partition(b':')
+                if name.strip().lower() == b'content-length':
+                    length = int(value) if value.strip().isdigit() else -1
+            
+            if length is None:
+                logger.warning("MJPEG parts carry no Content-Length; scanning for markers")
+                yield from super()._iter_jpegs(copy)
+                return
+            if not 0 < length <= MAX_FRAME_SIZE:
+                # Resynchronise on the next boundary line
+                logger.warning("Dropping oversized or corrupt MJPEG frame")
+                continue
+            
+            if copy:
+                jpg = response.read(length)
+                if len(jpg) < length:
+                    return
+                yield jpg
+            else:
+                if len(buffer) < length:
+                    buffer = bytearray(length)
+                with memoryview(buffer) as view, view[:length] as jpg_view:
+                    if response.readinto(jpg_view) < length:
+                        return
+                    yield jpg_view
+
+
 def extract_frame_from_stream(stream_url: str, timeout: int = 5) -> Optional[np.ndarray]:
     """
     Extract a single frame from an MJPEG stream.
@@ -4,14 +4,82 @@ Network utility functions for ESP32-CAM applications.
 This module provides network testing and discovery utilities.
 """
 
+import ipaddress
+import selectors
 import socket
+import threading
+import time
 import requests
 import logging
-from typing import List, Dict, Optional
+from functools import lru_cache
+from itertools import compress
+from types import MappingProxyType
+from typing import Callable, Iterable, List, Dict, Mapping, Optional, Tuple, Union
 from urllib.parse import urlparse
 
+from ..core.http import SESSION
+from ..core.sockets import open_connections
+
 logger = logging.getLogger(__name__)
 
+# Host name lookups are cached briefly; cameras on DHCP/mDNS can change address
+DNS_CACHE_TTL = 30.0
+DNS_CACHE_MAX_ENTRIES = 1024
+
+_dns_cache: Dict[tuple, Tuple[float, list]] = {}
+_dns_lock = threading.Lock()
+_dns_ttl = DNS_CACHE_TTL
+_original_getaddrinfo: Optional[Callable] = None
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """socket.getaddrinfo replacement that reuses recent results."""
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+    entry = _dns_cache.get(key)
+    if entry is not None and now - entry[0] < _dns_ttl:
+        return list(entry[1])
+    
+    result = _original_getaddrinfo(host, port, family, type, proto, flags)
+    with _dns_lock:
+        if len(_dns_cache) >= DNS_CACHE_MAX_ENTRIES:
+            _dns_cache.clear()
+        _dns_cache[key] = (now, result)
+    return list(result)
+
+
+def install_dns_cache(ttl: float = DNS_CACHE_TTL):
+    """
+    Cache socket.getaddrinfo results process-wide.
+    
+    Repeated checks of the same camera host name then skip the resolver.
+    Calling this again only updates the TTL.
+    
+    Args:
+        ttl: Seconds for which a lookup result is reused
+    """
+    global _original_getaddrinfo, _dns_ttl
+    _dns_ttl = ttl
+    if _original_getaddrinfo is None:
+        _original_getaddrinfo = socket.getaddrinfo
+        socket.getaddrinfo = _cached_getaddrinfo
+        logger.debug(f"Installed DNS cache (TTL {ttl}s)")
+
+
+def uninstall_dns_cache():
+    """Restore the original socket.getaddrinfo and drop cached lookups."""
+    global _original_getaddrinfo
+    if _original_getaddrinfo is not None:
+        socket.getaddrinfo = _original_getaddrinfo
+        _original_getaddrinfo = None
+    clear_dns_cache()
+
+
+def clear_dns_cache():
+    """Drop all cached host name lookups."""
+    with _dns_lock:
+        _dns_cache.clear()
+
 
 def test_url_reachable(url: str, timeout: int = 5) -> bool:
     """
@@ -25,7 +93,7 @@ def test_url_reachable(url: str, timeout: int = 5) -> bool:
         True if URL is reachable, False otherwise
     """
     try:
-        response = requests.get(url, timeout=timeout)
+        response = SESSION.get(url, timeout=timeout)
         return response.status_code == 200
     except Exception as e:
         logger.error(f"URL {url} not reachable: {e}")
@@ -63,45 +131,187 @@ def test_tcp_port(host: str, port: int, timeout: float = 3.0) -> bool:
         True if port is open, False otherwise
     """
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, port))
-        sock.close()
-        return result == 0
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
     except Exception as e:
         logger.error(f"Error testing port {host}:{port} - {e}")
         return False
 
 
+def scan_ports_batch(hosts: Iterable[str], port: int, timeout: float = 0.5,
+                     batch: int = 256) -> List[str]:
+    """
+    Find which hosts have a TCP port open, probing a batch of hosts at once.
+    
+    Non-blocking connects are started for a whole batch and waited on with
+    a single selector loop, so each batch takes at most one timeout.
+    
+    Args:
+        hosts: Host IP addresses
+        port: Port number
+        timeout: Connection timeout in seconds for each batch
+        batch: Maximum number of connections in flight
+        
+    Returns:
+        Hosts with the port open, in input order
+    """
+    hosts = list(hosts)
+    found = bytearray(len(hosts))
+    step = max(1, batch)
+    
+    for start in range(0, len(hosts), step):
+        for index, sock in open_connections(hosts[start:start + step], port, timeout):
+            found[start + index] = 1
+            sock.close()
+    
+    return list(compress(hosts, found))
+
+
+def _subnet_hosts(subnet: str) -> List[str]:
+    """
+    List the host addresses of a /24 subnet.
+    
+    Args:
+        subnet: Subnet prefix (e.g., "192.168.2")
+        
+    Returns:
+        The 254 host addresses, in order
+        
+    Raises:
+        ValueError: If subnet is not the first three octets of an IPv4 address
+    """
+    # Validating up front means no probe falls back to name resolution
+    network = ipaddress.IPv4Network(f"{subnet}.0/24")
+    return [str(host) for host in network.hosts()]
+
+
+def scan_subnet_select(subnet: str, port: int = 80,
+                       timeout: float = 0.5) -> List[str]:
+    """
+    Find hosts in a /24 subnet with a TCP port open.
+    
+    All 254 hosts are connected to at once from a single thread, so the
+    scan finishes within one timeout window.
+    
+    Args:
+        subnet: Subnet prefix (e.g., "192.168.2")
+        port: Port to scan (default: 80)
+        timeout: Connection timeout in seconds
+        
+    Returns:
+        Hosts with the port open, in address order
+        
+    Raises:
+        ValueError: If subnet is not the first three octets of an IPv4 address
+    """
+    ips = _subnet_hosts(subnet)
+    return scan_ports_batch(ips, port, timeout, batch=len(ips))
+
+
+def _is_http_ok(response: bytes) -> bool:
+    """Check whether a raw HTTP response starts with a 200 status line."""
+    status_line = response.split(b"\r\n", 1)[0].split()
+    return (len(status_line) >= 2 and status_line[0].startswith(b"HTTP/")
+            and status_line[1] == b"200")
+
+
+def _serves_root_page_batch(hosts: List[str], port: int, timeout: float,
+                            read_timeout: float = 1.0) -> bytearray:
+    """
+    Check which hosts answer their root page with HTTP 200.
+    
+    The request is sent on the connection that proved the port open, so a
+    camera costs one TCP handshake instead of a port probe plus a second
+    connection for the HTTP request.
+    
+    Args:
+        hosts: Host IP addresses
+        port: HTTP port
+        timeout: Connection timeout in seconds
+        read_timeout: Seconds to wait for the status lines after connecting
+        
+    Returns:
+        One flag per host, set to 1 for hosts that answered with HTTP 200
+    """
+    found = bytearray(len(hosts))
+    selector = selectors.DefaultSelector()
+    
+    try:
+        for index, sock in open_connections(hosts, port, timeout):
+            request = (f"GET / HTTP/1.1\r\nHost: {hosts[index]}:{port}\r\n"
+                       f"Connection: close\r\n\r\n").encode()
+            try:
+                sock.send(request)
+            except OSError:
+                sock.close()
+                continue
+            selector.register(sock, selectors.EVENT_READ, (index, bytearray()))
+        
+        deadline = time.monotonic() + read_timeout
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                sock = key.fileobj
+                index, data = key.data
+                try:
+                    chunk = sock.recv(256)
+                except OSError:
+                    chunk = b""
+                data += chunk
+                
+                # The status line is all that is needed
+                if not chunk or b"\r\n" in data:
+                    selector.unregister(sock)
+                    sock.close()
+                    if _is_http_ok(data):
+                        found[index] = 1
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+    
+    return found
+
+
 def discover_cameras_in_subnet(subnet: str, port: int = 80, 
-                               timeout: float = 0.5) -> List[str]:
+                               timeout: float = 0.5, batch: int = 256) -> List[str]:
     """
     Discover ESP32-CAM devices in a subnet.
     
+    Hosts are connected to in batches with non-blocking sockets, and every
+    host that accepts is asked for its root page over that same connection.
+    Use scan_ports_batch or test_tcp_port when only the port state matters.
+    
     Args:
         subnet: Subnet prefix (e.g., "192.168.2")
         port: Port to scan (default: 80)
         timeout: Timeout per host check
+        batch: Maximum number of connections in flight
         
     Returns:
         List of discovered camera IP addresses
+        
+    Raises:
+        ValueError: If subnet is not the first three octets of an IPv4 address
     """
-    discovered = []
-    
+    ips = _subnet_hosts(subnet)
     logger.info(f"Scanning subnet {subnet}.0/24 on port {port}")
     
-    for i in range(1, 255):
-        ip = f"{subnet}.{i}"
-        if test_tcp_port(ip, port, timeout):
-            # Additional check: try to access the root page
-            try:
-                url = f"http://{ip}:{port}/"
-                response = requests.get(url, timeout=1)
-                if response.status_code == 200:
-                    discovered.append(ip)
-                    logger.info(f"Discovered camera at {ip}")
-            except:
-                pass
+    # One flag per candidate, set by index, so the result keeps scan order
+    found = bytearray(len(ips))
+    step = max(1, batch)
+    
+    for start in range(0, len(ips), step):
+        found[start:start + step] = _serves_root_page_batch(ips[start:start + step],
+                                                            port, timeout)
+    
+    discovered = list(compress(ips, found))
+    for ip in discovered:
+        logger.info(f"Discovered camera at {ip}")
     
     return discovered
 
@@ -144,7 +354,7 @@ def test_stream_endpoint(stream_url: str, timeout: int = 5) -> Dict[str, any]:
     }
     
     try:
-        response = requests.get(stream_url, timeout=timeout, stream=True)
+        response = SESSION.get(stream_url, timeout=timeout, stream=True)
         result['accessible'] = response.status_code == 200
         result['content_type'] = response.headers.get('Content-Type')
         response.close()
@@ -161,21 +371,26 @@ def test_stream_endpoint(stream_url: str, timeout: int = 5) -> Dict[str, any]:
     return result
 
 
-def format_connection_info(ip: str, port: int = 80) -> Dict[str, str]:
+@lru_cache(maxsize=256)
+def format_connection_info(ip: str, port: int = 80) -> Mapping[str, Union[str, int]]:
     """
     Format connection information for a camera.
     
+    Results are cached per (ip, port), so the mapping is read-only; use
+    dict(...) for a mutable copy.
+    
     Args:
         ip: Camera IP address
         port: Camera port
         
     Returns:
-        Dictionary with formatted URLs and connection info
+        Read-only mapping with formatted URLs and connection info
     """
-    return {
+    base_url = f"http://{ip}:{port}"
+    return MappingProxyType({
         'ip': ip,
         'port': port,
-        'stream_url': f"http://{ip}:{port}/stream",
-        'status_url': f"http://{ip}:{port}/",
-        'web_interface': f"http://{ip}:{port}"
-    }
+        'stream_url': f"{base_url}/stream",
+        'status_url': f"{base_url}/",
+        'web_interface': base_url
+    })
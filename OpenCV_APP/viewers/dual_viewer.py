@@ -8,15 +8,10 @@ ESP32-CAM devices simultaneously.
 import cv2
 import numpy as np
 import logging
-from typing import Optional
-import sys
-from pathlib import Path
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from core import get_config, ConnectionManager
-from utils import FrameCapture
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from ..core import get_config, ConnectionManager
+from ..utils import FrameCapture
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +28,10 @@ class DualCameraViewer:
         """
         self.config = get_config(config_file)
         self.connection_manager = ConnectionManager(retry_attempts=3, retry_delay=2)
-        self.frame_capture = FrameCapture()
+        self.frame_capture = FrameCapture(async_writes=True)
+        # Both streams are read at the same time so a loop waits for the
+        # slower camera rather than for the two in turn
+        self._read_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="camera-read")
         self.running = False
         
         # Get camera configurations
@@ -68,6 +66,11 @@ class DualCameraViewer:
             logger.error(f"Camera connection results: {results}")
             return False
     
+    @staticmethod
+    def _read(camera) -> Tuple[bool, Optional[np.ndarray]]:
+        """Read a frame from a camera that may be missing."""
+        return camera.read() if camera else (False, None)
+    
     def run(self):
         """Run the dual camera viewer."""
         if not self.setup_cameras():
@@ -87,9 +90,11 @@ class DualCameraViewer:
         logger.info("Starting viewer loop. Press 'q' to quit, 's' to save frames")
         
         while self.running:
-            # Read frames
-            ret1, frame1 = cam1.read() if cam1 else (False, None)
-            ret2, frame2 = cam2.read() if cam2 else (False, None)
+            # Read frames from both cameras concurrently
+            read1 = self._read_pool.submit(self._read, cam1)
+            read2 = self._read_pool.submit(self._read, cam2)
+            ret1, frame1 = read1.result()
+            ret2, frame2 = read2.result()
             
             # Display frames
             if ret1 and frame1 is not None:
@@ -122,6 +127,8 @@ class DualCameraViewer:
         
         # Cleanup
         cv2.destroyAllWindows()
+        self._read_pool.shutdown(wait=True)
+        self.frame_capture.flush()
         self.connection_manager.disconnect_all()
         logger.info("Viewer stopped")
 
@@ -7,17 +7,33 @@ from a single ESP32-CAM device.
 
 import cv2
 import logging
+import queue
+import threading
+import time
 from typing import Optional
-import sys
-from pathlib import Path
+from ..core import get_config, ESP32Camera
+from ..utils import FrameCapture
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+logger = logging.getLogger(__name__)
 
-from core import get_config, ESP32Camera
-from utils import FrameCapture
+# How long the UI loop waits for a new frame before servicing key presses
+FRAME_POLL_TIMEOUT = 0.005
 
-logger = logging.getLogger(__name__)
+# Pause after a failed camera read so a dead stream does not spin a core
+READ_RETRY_DELAY = 0.05
+
+# How long closing the window waits for the reader thread; a read blocked on
+# the network can take longer, and the reader then disconnects on its own
+READER_JOIN_TIMEOUT = 2.0
+
+# Frame counter overlay. Drawing it with cv2.putText each frame costs about
+# as much as compositing prerendered digits would: the text is anti-aliased,
+# so sprites would need a per-pixel blend with the frame underneath
+COUNTER_ORIGIN = (10, 30)
+COUNTER_FONT = cv2.FONT_HERSHEY_SIMPLEX
+COUNTER_SCALE = 0.7
+COUNTER_COLOR = (0, 255, 0)
+COUNTER_THICKNESS = 2
 
 
 class SingleCameraViewer:
@@ -33,9 +49,11 @@ class SingleCameraViewer:
         """
         self.config = get_config(config_file)
         self.camera_name = camera_name
-        self.frame_capture = FrameCapture()
+        self.frame_capture = FrameCapture(async_writes=True)
         self.camera: Optional[ESP32Camera] = None
         self.running = False
+        # Holds only the newest frame; the reader replaces unconsumed ones
+        self._frames: queue.Queue = queue.Queue(maxsize=1)
         
         # Get camera configuration
         cam_config = self.config.get_camera(camera_name)
@@ -55,6 +73,33 @@ class SingleCameraViewer:
         logger.info(f"Connecting to {self.camera_name}...")
         return self.camera.connect()
     
+    def _read_frames(self):
+        """
+        Read frames until stopped, keeping only the newest one queued.
+        
+        The camera is disconnected here once reading stops, so the capture
+        is never released while a read on it is still in progress.
+        """
+        try:
+            while self.running:
+                ret, frame = self.camera.read()
+                if not ret or frame is None:
+                    logger.warning("Failed to read frame")
+                    time.sleep(READ_RETRY_DELAY)
+                    continue
+                
+                try:
+                    self._frames.put_nowait(frame)
+                except queue.Full:
+                    # The UI has not shown the previous frame yet; drop it
+                    try:
+                        self._frames.get_nowait()
+                    except queue.Empty:
+                        pass
+                    self._frames.put_nowait(frame)
+        finally:
+            self.camera.disconnect()
+    
     def run(self):
         """Run the single camera viewer."""
         if not self.connect():
@@ -67,45 +112,55 @@ class SingleCameraViewer:
         window_name = f"{self.camera_name} - Press 'q' to quit, 's' to save"
         cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
         
+        # Network reads block, so they run on their own thread and never
+        # stall window redraws or key handling
+        reader = threading.Thread(target=self._read_frames,
+                                  name=f"read-{self.camera_name}", daemon=True)
+        reader.start()
+        
         logger.info("Starting viewer loop")
         frame_count = 0
+        ret, frame = False, None
         
-        while self.running:
-            # Read frame
-            ret, frame = self.camera.read()
-            
-            if ret and frame is not None:
-                frame_count += 1
+        try:
+            while self.running:
+                try:
+                    frame = self._frames.get(timeout=FRAME_POLL_TIMEOUT)
+                    ret = True
+                except queue.Empty:
+                    pass
+                else:
+                    frame_count += 1
+                    
+                    # Add frame counter overlay
+                    cv2.putText(frame, f"Frame: {frame_count}", COUNTER_ORIGIN,
+                               COUNTER_FONT, COUNTER_SCALE, COUNTER_COLOR, COUNTER_THICKNESS)
+                    
+                    # Display frame
+                    cv2.imshow(window_name, frame)
                 
-                # Add frame counter overlay
-                cv2.putText(frame, f"Frame: {frame_count}", (10, 30),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                # Handle keyboard input
+                key = cv2.waitKey(1) & 0xFF
                 
-                # Display frame
-                cv2.imshow(window_name, frame)
-            else:
-                logger.warning("Failed to read frame")
-            
-            # Handle keyboard input
-            key = cv2.waitKey(1) & 0xFF
-            
-            if key == ord('q'):
-                logger.info("Quit requested")
-                self.running = False
-            elif key == ord('s'):
-                if ret and frame is not None:
-                    logger.info("Saving frame")
-                    self.frame_capture.save_frame(frame, self.camera_name)
-                else:
-                    logger.warning("Cannot save - frame unavailable")
-            elif key == ord('a'):
-                if ret and frame is not None:
-                    logger.info("Saving annotated frame")
-                    self.frame_capture.save_annotated_frame(frame, self.camera_name)
-        
-        # Cleanup
-        cv2.destroyAllWindows()
-        self.camera.disconnect()
+                if key == ord('q'):
+                    logger.info("Quit requested")
+                    self.running = False
+                elif key == ord('s'):
+                    if ret and frame is not None:
+                        logger.info("Saving frame")
+                        self.frame_capture.save_frame(frame, self.camera_name)
+                    else:
+                        logger.warning("Cannot save - frame unavailable")
+                elif key == ord('a'):
+                    if ret and frame is not None:
+                        logger.info("Saving annotated frame")
+                        self.frame_capture.save_annotated_frame(frame, self.camera_name)
+        finally:
+            # Cleanup; the reader disconnects the camera when its read returns
+            self.running = False
+            reader.join(timeout=READER_JOIN_TIMEOUT)
+            cv2.destroyAllWindows()
+            self.frame_capture.flush()
         logger.info(f"Viewer stopped. Total frames: {frame_count}")
 
 
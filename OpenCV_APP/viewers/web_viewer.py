@@ -5,23 +5,72 @@ This module provides a Flask-based web interface for viewing camera streams
 and controlling cameras through a web browser.
 """
 
-from flask import Flask, render_template_string, Response, jsonify
+from flask import Flask, render_template_string, request, Response, jsonify
 import cv2
+import numpy as np
 import logging
-from typing import Optional
-import sys
-from pathlib import Path
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from ..core import get_config, ConnectionManager, CameraBase
+from ..utils.jpeg_codec import decode_jpeg, encode_jpeg, jpeg_size
+from ..utils.mjpeg_parser import RawMJPEGStream
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from core import get_config, ConnectionManager
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # optional dependency, fall back to Flask's server
+    BaseApplication = None
 
 logger = logging.getLogger(__name__)
 
+# Seconds a client waits for a new frame before checking the broadcaster
+FRAME_WAIT_TIMEOUT = 1.0
+
+# JPEG quality of frames streamed to browsers
+STREAM_JPEG_QUALITY = 80
+
+# Header of each part of the multipart stream; the length lets clients
+# read the image without scanning for the next boundary
+PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'
+
+# Width the index page requests transcoded streams at; matches the page's
+# img max-width. Passthrough streams are only scaled when a client asks.
+STREAM_WIDTH = 640
+
+# Frames per second decoded for browsers unless a camera sets target_fps
+WEB_TARGET_FPS = 10.0
+
+# A broadcasting camera is reported healthy if its last frame is this recent
+HEALTH_MAX_AGE = 2.0
+
+# Pause after a failed camera read so a dead stream does not spin a core
+READ_RETRY_DELAY = 0.05
+
+# Pause before reopening a camera stream that dropped or refused to open
+RECONNECT_DELAY = 1.0
+
+# Threads per gunicorn worker; every open stream keeps one thread busy
+SERVER_THREADS = 16
+
 app = Flask(__name__)
 connection_manager: Optional[ConnectionManager] = None
 config = None
+broadcasters: Dict[str, "FrameBroadcaster"] = {}
+
+# Shared by /capture requests so saves finish in the background
+_frame_capture = None
+_frame_capture_lock = threading.Lock()
+
+# Width the index page requests streams at (None for the original size)
+_page_stream_width: Optional[int] = None
+
+# Rendered index page per application root; it only depends on url_for()
+_index_pages: Dict[str, bytes] = {}
+
+
+def _multipart(jpeg: bytes) -> bytes:
+    """Build the multipart stream part carrying a JPEG image."""
+    return b''.join((PART_HEADER % len(jpeg), jpeg, b'\r\n'))
 
 
 # HTML template for the web interface
@@ -93,7 +142,7 @@ HTML_TEMPLATE = """
     <div class="camera-container">
         <div class="camera-box">
             <h2>ESP32_CAM_1</h2>
-            <img src="{{ url_for('video_feed', camera_name='ESP32_CAM_1') }}" 
+            <img src="{{ url_for('video_feed', camera_name='ESP32_CAM_1', w=stream_width) }}" 
                  alt="Camera 1 Stream" onerror="this.src='/static/no-signal.png'">
             <div class="controls">
                 <button onclick="refreshStream('ESP32_CAM_1')">🔄 Refresh</button>
@@ -103,7 +152,7 @@ HTML_TEMPLATE = """
         
         <div class="camera-box">
             <h2>ESP32_CAM_2</h2>
-            <img src="{{ url_for('video_feed', camera_name='ESP32_CAM_2') }}" 
+            <img src="{{ url_for('video_feed', camera_name='ESP32_CAM_2', w=stream_width) }}" 
                  alt="Camera 2 Stream" onerror="this.src='/static/no-signal.png'">
             <div class="controls">
                 <button onclick="refreshStream('ESP32_CAM_2')">🔄 Refresh</button>
@@ -116,7 +165,9 @@ HTML_TEMPLATE = """
         function refreshStream(cameraName) {
             const imgs = document.querySelectorAll('img[alt*="' + cameraName + '"]');
             imgs.forEach(img => {
-                img.src = img.src.split('?')[0] + '?t=' + new Date().getTime();
+                const url = new URL(img.src);
+                url.searchParams.set('t', new Date().getTime());
+                img.src = url;
             });
         }
         
@@ -136,47 +187,353 @@ HTML_TEMPLATE = """
 """
 
 
-def generate_frames(camera_name: str):
+class FrameBroadcaster:
+    """
+    Reads a camera on a background thread and shares its latest frame.
+    
+    Every web client of a camera is served from the same reads, so the
+    camera stream is read once however many browsers are watching, and a
+    slow client skips to the newest frame instead of falling behind. Each
+    frame is also JPEG-encoded once here rather than once per client.
+    
+    Frames arriving faster than target_fps are grabbed from the stream but
+    never decoded. Each camera has its own broadcaster thread, and both
+    OpenCV and TurboJPEG release the GIL while encoding, so cameras encode
+    in parallel.
+    """
+    
+    def __init__(self, camera: CameraBase, target_fps: Optional[float] = None):
+        """
+        Initialize the broadcaster.
+        
+        Args:
+            camera: Connected camera to read from
+            target_fps: Maximum frames per second to decode and publish
+                (None publishes every frame)
+        """
+        self.camera = camera
+        self.target_fps = target_fps
+        self.running = False
+        self._cv = threading.Condition()
+        self._jpeg: Optional[bytes] = None
+        # Widths clients stream at, with the number of clients at each
+        self._widths: Dict[int, int] = {}
+        # Multipart parts of the latest frame, keyed by width (None for the
+        # original size)
+        self._parts: Dict[Optional[int], bytes] = {}
+        self._seq = 0
+        # time.monotonic() of the last published frame
+        self.last_frame_ts: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start reading frames in the background."""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=f"broadcast-{self.camera.name}")
+        self._thread.start()
+        logger.info(f"Started frame broadcaster for {self.camera.name}")
+    
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the reader thread and wake up waiting clients.
+        
+        Args:
+            timeout: Maximum seconds to wait for the reader to finish
+        """
+        self.running = False
+        with self._cv:
+            self._cv.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        """Read frames until stopped, publishing at most target_fps of them."""
+        interval = 1.0 / self.target_fps if self.target_fps else 0.0
+        last_publish = float('-inf')
+        while self.running:
+            # Keep draining the stream so the published frame stays current
+            if not self.camera.grab():
+                time.sleep(READ_RETRY_DELAY)
+                continue
+            
+            now = time.monotonic()
+            if now - last_publish < interval:
+                continue
+            
+            ret, frame = self.camera.retrieve()
+            if not ret or frame is None:
+                continue
+            last_publish = now
+            
+            jpeg = encode_jpeg(frame, STREAM_JPEG_QUALITY)
+            if jpeg is None:
+                continue
+            
+            # Published frames are only scaled, on this thread, before the
+            # next read, so the camera's reused buffer is passed on uncopied
+            self._publish(frame, jpeg)
+    
+    def subscribe(self, width: int):
+        """
+        Register a client streaming frames at most width pixels wide.
+        
+        From the next frame on, frames are scaled to that width once, on the
+        broadcaster thread, for all clients at that width.
+        
+        Args:
+            width: Requested stream width
+        """
+        with self._cv:
+            self._widths[width] = self._widths.get(width, 0) + 1
+    
+    def unsubscribe(self, width: int):
+        """
+        Unregister a client added with subscribe().
+        
+        Args:
+            width: Width the client streamed at
+        """
+        with self._cv:
+            count = self._widths.pop(width, 0) - 1
+            if count > 0:
+                self._widths[width] = count
+    
+    def _scale(self, frame: Optional[np.ndarray], jpeg: bytes,
+               widths) -> Dict[Optional[int], bytes]:
+        """
+        Encode the multipart parts of a frame for the widths it is wider than.
+        
+        Args:
+            frame: Decoded frame, or None to decode jpeg if scaling is needed
+            jpeg: Frame as JPEG
+            widths: Widths clients stream at
+        
+        Returns:
+            Parts keyed by width
+        """
+        if frame is not None:
+            source_width = frame.shape[1]
+        else:
+            size = jpeg_size(jpeg)
+            source_width = size[0] if size is not None else None
+        widths = [w for w in widths if source_width is None or w < source_width]
+        if not widths:
+            return {}
+        
+        if frame is None:
+            frame = decode_jpeg(jpeg)
+            if frame is None:
+                return {}
+        
+        parts: Dict[Optional[int], bytes] = {}
+        height, source_width = frame.shape[:2]
+        for width in widths:
+            if width >= source_width:
+                continue
+            scaled_height = max(1, round(height * width / source_width))
+            scaled = encode_jpeg(cv2.resize(frame, (width, scaled_height),
+                                            interpolation=cv2.INTER_AREA),
+                                 STREAM_JPEG_QUALITY)
+            if scaled is not None:
+                parts[width] = _multipart(scaled)
+        return parts
+    
+    def _publish(self, frame: Optional[np.ndarray], jpeg: bytes):
+        """Make a new frame available to clients, scaled for their widths."""
+        with self._cv:
+            widths = list(self._widths)
+        
+        # Scale outside the lock so clients and the next publish never wait
+        parts: Dict[Optional[int], bytes] = {}
+        if widths:
+            parts = self._scale(frame, jpeg, widths)
+        
+        with self._cv:
+            self._jpeg = jpeg
+            self._parts = parts
+            self._seq += 1
+            self.last_frame_ts = time.monotonic()
+            self._cv.notify_all()
+    
+    @property
+    def is_connected(self) -> bool:
+        """Whether the stream frames are read from is open."""
+        return self.camera.is_connected
+    
+    def is_healthy(self, max_age: float = HEALTH_MAX_AGE) -> bool:
+        """
+        Check whether the camera is delivering frames.
+        
+        Args:
+            max_age: Maximum age in seconds of the last frame
+        
+        Returns:
+            True if running and a frame arrived within max_age seconds
+        """
+        last = self.last_frame_ts
+        return self.running and last is not None and time.monotonic() - last < max_age
+    
+    def latest_jpeg(self) -> Tuple[int, Optional[bytes]]:
+        """
+        Get the newest frame as JPEG without waiting.
+        
+        Returns:
+            Tuple of (sequence number, JPEG bytes); the bytes are None until
+            the first frame arrives
+        """
+        with self._cv:
+            return self._seq, self._jpeg
+    
+    def _wait_newer(self, last_seq: int, timeout: float) -> bool:
+        """Wait, holding the lock, until a frame newer than last_seq exists."""
+        self._cv.wait_for(lambda: self._seq > last_seq or not self.running, timeout)
+        return self._seq > last_seq
+    
+    def wait_for_jpeg(self, last_seq: int,
+                      timeout: float = FRAME_WAIT_TIMEOUT) -> Tuple[int, Optional[bytes]]:
+        """
+        Wait for a frame newer than last_seq, already JPEG-encoded.
+        
+        Args:
+            last_seq: Sequence number of the last frame the caller received
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            Tuple of (sequence number, JPEG bytes); the bytes are None if no
+            new frame arrived in time or the broadcaster stopped
+        """
+        with self._cv:
+            if not self._wait_newer(last_seq, timeout):
+                return last_seq, None
+            return self._seq, self._jpeg
+    
+    def wait_for_part(self, last_seq: int, timeout: float = FRAME_WAIT_TIMEOUT,
+                      width: Optional[int] = None) -> Tuple[int, Optional[bytes]]:
+        """
+        Wait for a frame newer than last_seq, as a multipart stream part.
+        
+        The part is built once per frame and width and shared by all
+        clients, so streaming a frame to another client copies nothing.
+        Scaled parts only exist for widths registered with subscribe(); other
+        widths, and frames already narrow enough, get the original size.
+        
+        Args:
+            last_seq: Sequence number of the last frame the caller received
+            timeout: Maximum seconds to wait
+            width: Width the caller subscribed to (None for the original size)
+            
+        Returns:
+            Tuple of (sequence number, part bytes); the bytes are None if no
+            new frame arrived in time or the broadcaster stopped
+        """
+        with self._cv:
+            if not self._wait_newer(last_seq, timeout):
+                return last_seq, None
+            part = self._parts.get(width) if width is not None else None
+            if part is None:
+                part = self._parts.get(None)
+                if part is None:
+                    part = _multipart(self._jpeg)
+                    self._parts[None] = part
+            return self._seq, part
+
+
+class PassthroughBroadcaster(FrameBroadcaster):
+    """
+    Forwards a camera's own MJPEG images to web clients.
+    
+    ESP32-CAM already streams JPEGs, so instead of decoding them with OpenCV
+    and encoding them again, the images are split out of the camera's
+    multipart stream and passed on unchanged. A frame is only decoded when
+    a client asks for a narrower stream.
+    """
+    
+    def __init__(self, camera: CameraBase, timeout: int = 5):
+        """
+        Initialize the broadcaster.
+        
+        Args:
+            camera: Camera whose stream_url serves MJPEG over HTTP; it does
+                not need to be connected
+            timeout: Connection and read timeout in seconds
+        """
+        super().__init__(camera)
+        self.timeout = timeout
+        self._stream_open = False
+    
+    @property
+    def is_connected(self) -> bool:
+        """Whether the camera's MJPEG stream is open; the camera itself is not used."""
+        return self._stream_open
+    
+    def _run(self):
+        """Forward images until stopped, reopening the stream if it drops."""
+        while self.running:
+            parser = RawMJPEGStream(self.camera.stream_url, timeout=self.timeout)
+            try:
+                if parser.connect():
+                    self._stream_open = True
+                    for jpeg in parser.iter_jpegs():
+                        if not self.running:
+                            break
+                        self._publish(None, jpeg)
+            except Exception as e:
+                logger.error(f"Error forwarding stream of {self.camera.name}: {e}")
+            finally:
+                self._stream_open = False
+                parser.disconnect()
+            
+            if self.running:
+                time.sleep(RECONNECT_DELAY)
+
+
+def generate_frames(camera_name: str, width: Optional[int] = None):
     """
     Generate frames for streaming.
     
+    Frames come from the camera's broadcaster, so all clients share one
+    reader and one JPEG encode per frame and width, and each client gets
+    the newest frame.
+    
     Args:
         camera_name: Name of the camera
+        width: Downscale frames wider than this (None streams the original size)
         
     Yields:
         JPEG frames in multipart format
     """
-    global connection_manager
-    
-    if not connection_manager:
-        return
-    
-    camera = connection_manager.get_camera(camera_name)
-    if not camera:
+    broadcaster = broadcasters.get(camera_name)
+    if not broadcaster:
         logger.error(f"Camera {camera_name} not found")
         return
     
-    while True:
-        ret, frame = camera.read()
-        if not ret or frame is None:
-            continue
-        
-        # Encode frame as JPEG
-        ret, buffer = cv2.imencode('.jpg', frame)
-        if not ret:
-            continue
-        
-        frame_bytes = buffer.tobytes()
-        
-        # Yield frame in multipart format
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+    if width is not None:
+        broadcaster.subscribe(width)
+    try:
+        seq = 0
+        while broadcaster.running:
+            # One buffer per frame, shared with the other clients
+            seq, part = broadcaster.wait_for_part(seq, width=width)
+            if part is not None:
+                yield part
+    finally:
+        if width is not None:
+            broadcaster.unsubscribe(width)
 
 
 @app.route('/')
 def index():
     """Render the main page."""
-    return render_template_string(HTML_TEMPLATE)
+    page = _index_pages.get(request.script_root)
+    if page is None:
+        page = render_template_string(HTML_TEMPLATE,
+                                      stream_width=_page_stream_width).encode()
+        _index_pages[request.script_root] = page
+    return Response(page, mimetype='text/html')
 
 
 @app.route('/video_feed/<camera_name>')
@@ -184,15 +541,31 @@ def video_feed(camera_name: str):
     """
     Video streaming route.
     
+    The optional w query parameter downscales frames wider than w pixels,
+    which cuts encoding work and bandwidth for small displays.
+    
     Args:
         camera_name: Name of the camera to stream
     """
+    width = request.args.get('w', type=int)
+    if width is not None and width <= 0:
+        width = None
     return Response(
-        generate_frames(camera_name),
+        generate_frames(camera_name, width),
         mimetype='multipart/x-mixed-replace; boundary=frame'
     )
 
 
+def _get_frame_capture():
+    """Return the shared FrameCapture, creating it on first use."""
+    global _frame_capture
+    with _frame_capture_lock:
+        if _frame_capture is None:
+            from ..utils import FrameCapture
+            _frame_capture = FrameCapture(async_writes=True)
+        return _frame_capture
+
+
 @app.route('/capture/<camera_name>', methods=['POST'])
 def capture_frame(camera_name: str):
     """
@@ -210,11 +583,20 @@ def capture_frame(camera_name: str):
     if not camera:
         return jsonify({'error': f'Camera {camera_name} not found'}), 404
     
-    ret, frame = camera.read()
-    if ret and frame is not None:
-        from utils import FrameCapture
-        fc = FrameCapture()
-        path = fc.save_frame(frame, camera_name)
+    # A broadcasting camera is already being read by its own thread, and its
+    # latest frame is already encoded; the file is written in the background
+    path = None
+    broadcaster = broadcasters.get(camera_name)
+    if broadcaster and broadcaster.running:
+        jpeg = broadcaster.latest_jpeg()[1]
+        if jpeg is not None:
+            path = _get_frame_capture().save_jpeg(jpeg, camera_name)
+    else:
+        ret, frame = camera.read()
+        if ret and frame is not None:
+            path = _get_frame_capture().save_frame(frame, camera_name)
+    
+    if path:
         return jsonify({
             'message': f'Frame captured successfully',
             'path': path
@@ -231,41 +613,148 @@ def status():
     if not connection_manager:
         return jsonify({'error': 'Connection manager not initialized'}), 500
     
-    connected = connection_manager.get_connected_cameras()
-    health = connection_manager.health_check()
+    # Passthrough broadcasters open their own stream instead of the camera,
+    # so where a camera has a broadcaster, the broadcaster says if it is connected
+    sources = {**connection_manager.cameras, **broadcasters}
+    connected = [name for name, source in sources.items() if source.is_connected]
+    # Broadcasting cameras are judged by their last frame; probing them here
+    # would compete with the broadcaster for the camera's only stream
+    health = {name: broadcaster.is_healthy() for name, broadcaster in broadcasters.items()}
+    others = [name for name in connection_manager.cameras if name not in health]
+    if others:
+        health.update(connection_manager.health_check(names=others))
+    streaming = {name: broadcaster.running for name, broadcaster in broadcasters.items()}
     
     return jsonify({
         'connected_cameras': connected,
-        'health_status': health
+        'health_status': health,
+        'streaming': streaming
     })
 
 
-def initialize_cameras():
-    """Initialize camera connections."""
-    global connection_manager, config
+def initialize_cameras(passthrough: bool = True):
+    """
+    Initialize camera connections.
+    
+    Args:
+        passthrough: Forward the cameras' JPEGs to browsers unchanged. If
+            False, cameras are opened with OpenCV and every frame is decoded
+            and re-encoded.
+    """
+    global connection_manager, config, _page_stream_width
+    
+    # Readers from an earlier call would keep the old cameras' streams open
+    if broadcasters or connection_manager:
+        shutdown_cameras()
     
     config = get_config()
     connection_manager = ConnectionManager(retry_attempts=3, retry_delay=2)
     
+    # Scaling a passthrough stream means decoding every frame, so the page
+    # only asks for it when frames are decoded anyway
+    _page_stream_width = None if passthrough else STREAM_WIDTH
+    _index_pages.clear()
+    
     # Add cameras
     for cam_name in ["ESP32_CAM_1", "ESP32_CAM_2"]:
         cam_config = config.get_camera(cam_name)
         if cam_config:
             connection_manager.add_camera_from_config(cam_config)
     
+    if passthrough:
+        # The broadcaster holds the only stream connection; ESP32-CAM
+        # firmware usually serves a single stream client at a time
+        for cam_name, camera in connection_manager.cameras.items():
+            broadcaster = PassthroughBroadcaster(camera)
+            broadcaster.start()
+            broadcasters[cam_name] = broadcaster
+        return
+    
     # Connect to cameras
     results = connection_manager.connect_all()
     logger.info(f"Camera connection results: {results}")
+    
+    # One reader per connected camera, shared by all web clients
+    for cam_name, connected in results.items():
+        if connected:
+            cam_config = config.get_camera(cam_name)
+            target_fps = (cam_config.target_fps if cam_config else None) or WEB_TARGET_FPS
+            broadcaster = FrameBroadcaster(connection_manager.get_camera(cam_name),
+                                           target_fps)
+            broadcaster.start()
+            broadcasters[cam_name] = broadcaster
+
+
+def shutdown_cameras():
+    """Stop frame broadcasters and disconnect cameras."""
+    for broadcaster in broadcasters.values():
+        broadcaster.stop(timeout=FRAME_WAIT_TIMEOUT)
+    broadcasters.clear()
+    if _frame_capture is not None:
+        _frame_capture.flush()
+    if connection_manager:
+        connection_manager.disconnect_all()
+
+
+if BaseApplication is not None:
+    class GunicornServer(BaseApplication):
+        """Runs the Flask app under gunicorn with programmatic options."""
+        
+        def __init__(self, application, options: Dict):
+            self.application = application
+            self.options = options
+            super().__init__()
+        
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return self.application
 
 
-def main(host: str = '0.0.0.0', port: int = 5000, debug: bool = False):
+def run_gunicorn(host: str, port: int, workers: int, passthrough: bool):
+    """
+    Serve the web viewer with gunicorn's threaded workers.
+    
+    Each worker process opens its own cameras after it starts, so workers
+    encode and serve frames in parallel instead of sharing one GIL.
+    
+    Args:
+        host: Host to bind to
+        port: Port to listen on
+        workers: Number of worker processes
+        passthrough: Forward camera JPEGs without re-encoding them
+    """
+    options = {
+        'bind': f"{host}:{port}",
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': SERVER_THREADS,
+        # Streams never finish, so a request must not count as a hung worker
+        'timeout': 0,
+        'post_worker_init': lambda worker: initialize_cameras(passthrough=passthrough),
+        'worker_exit': lambda server, worker: shutdown_cameras(),
+    }
+    GunicornServer(app, options).run()
+
+
+def main(host: str = '0.0.0.0', port: int = 5000, debug: bool = False,
+         passthrough: bool = True, workers: int = 1):
     """
     Run the web viewer.
     
+    gunicorn is used when it is installed, except in debug mode; otherwise
+    Flask's threaded development server runs the app.
+    
     Args:
         host: Host to bind to
         port: Port to listen on
         debug: Enable debug mode
+        passthrough: Forward camera JPEGs without re-encoding them
+        workers: Number of gunicorn worker processes. Every worker opens its
+            own camera streams, so only raise this for cameras that accept
+            several stream clients.
     """
     # Setup logging
     logging.basicConfig(
@@ -273,11 +762,19 @@ def main(host: str = '0.0.0.0', port: int = 5000, debug: bool = False):
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
+    if BaseApplication is not None and not debug:
+        logger.info(f"Starting gunicorn on http://{host}:{port} with {workers} worker(s)")
+        run_gunicorn(host, port, workers, passthrough)
+        return
+    
     logger.info("Initializing ESP32-CAM Web Viewer")
-    initialize_cameras()
+    initialize_cameras(passthrough=passthrough)
     
     logger.info(f"Starting web server on http://{host}:{port}")
-    app.run(host=host, port=port, debug=debug, threaded=True)
+    try:
+        app.run(host=host, port=port, debug=debug, threaded=True)
+    finally:
+        shutdown_cameras()
 
 
 if __name__ == "__main__":